@@ -1,22 +1,25 @@
+import json
+import uuid
+import requests
 import streamlit as st
-import nltk
-from nltk.corpus import stopwords
 import pandas as pd
-import os
-import textrazor
-import requests
-from collections import Counter
-import plotly.express as px
-import plotly.graph_objects as go
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-import io
-import base64
-from datetime import datetime
-import json
-from utils.text_analysis import extract_keywords, analyze_text_with_textrazor
-from utils.serp_analysis import analyze_serp_results, compare_with_serp
-from utils.visualization import create_keywords_chart, generate_wordcloud
+from utils.history import HistoryStore
+from utils.startup import ensure_nltk_resources, startup_timings, timed
+from utils.text_analysis import ENTITY_COLUMNS, extract_keywords, analyze_text_with_textrazor, get_textrazor_cache
+from utils.serp_analysis import analyze_serp_results, audit_urls, get_serp_cache
+from utils.serp_aggregation import ENTITY_COLUMNS as SERP_ENTITY_COLUMNS, KEYWORD_COLUMNS, TOPIC_COLUMNS
+from utils.serp_profile import SerpProfile
+from utils.visualization import (
+    clear_wordcloud_cache,
+    create_keywords_chart,
+    generate_wordcloud,
+    keyword_frequencies
+)
+from utils.extractor_pool import DEFAULT_LANGUAGES, DEFAULT_TOP, warm_up
+from utils.page_cache import get_page_cache
+from utils.rate_limit import PROVIDER_LIMITS, get_limiter
+from utils.service_client import DEFAULT_SERVICE_URL, AnalysisClient, ServiceError
+from utils.tracing import spans_to_jsonl, summarize_spans
 
 # Configuration de la page
 st.set_page_config(
@@ -49,28 +52,151 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Initialisation de NLTK
-nltk_data_dir = os.path.join(os.path.expanduser('~'), 'nltk_data')
-if not os.path.exists(nltk_data_dir):
-    os.makedirs(nltk_data_dir)
-nltk.data.path.append(nltk_data_dir)
-try:
-    nltk.download('stopwords', download_dir=nltk_data_dir)
-    nltk.download('punkt', download_dir=nltk_data_dir)
-except Exception as e:
-    st.error(f"Erreur lors du téléchargement des ressources NLTK : {e}")
+# Initialisation de NLTK (vérifiée une seule fois par processus)
+missing_nltk = [name for name, status in ensure_nltk_resources().items() if status == 'missing']
+if missing_nltk:
+    st.error(f"Ressources NLTK indisponibles : {', '.join(missing_nltk)}")
+
+# Avec YAKE_V4_SERVICE_URL, les analyses sont confiées au service local partagé (python -m utils.service)
+@st.cache_resource
+def get_service_client():
+    return AnalysisClient(DEFAULT_SERVICE_URL) if DEFAULT_SERVICE_URL else None
+
+service = get_service_client()
+# Service injoignable ou job en échec
+SERVICE_ERRORS = (requests.RequestException, ServiceError)
+
+def stop_on_service_error(error, request_key):
+    """Affiche l'échec du service, abandonne la demande en cours et arrête l'exécution."""
+    st.error(f"Service d'analyse indisponible ou en échec : {error}")
+    st.session_state.pop(request_key, None)
+    st.stop()
+
+# Mémoïsation des analyses entre les réexécutions Streamlit (bornée en nombre d'entrées)
+MEMO_MAX_ENTRIES = 32
+MEMO_TTL = 3600
+# Durée maximale d'une analyse SERP : le rapport est produit à l'échéance avec les pages terminées
+SERP_TIME_BUDGET = 120
+
+@st.cache_data(max_entries=MEMO_MAX_ENTRIES, ttl=MEMO_TTL, show_spinner="Extraction des mots-clés...")
+def memo_extract_keywords(text, language, max_keywords):
+    if service:
+        keywords = service.run('extract_keywords', text=text, language=language, max_keywords=max_keywords)
+        return pd.DataFrame(keywords['data'], columns=keywords['columns'])
+    return extract_keywords(text, language=language, max_keywords=max_keywords)
+
+class AnalysisFailed(Exception):
+    """Échec signalé depuis une fonction mémoïsée : st.cache_data ne garde pas le résultat."""
+
+@st.cache_data(max_entries=MEMO_MAX_ENTRIES, ttl=MEMO_TTL, show_spinner="Analyse TextRazor...")
+def _memo_textrazor(text_or_url, api_key, is_url, language):
+    if service:
+        analysis = service.run('textrazor', text_or_url=text_or_url, textrazor_api_key=api_key, is_url=is_url,
+                               language=language)
+        entities = analysis['entities']
+        entities_df = pd.DataFrame(entities, columns=ENTITY_COLUMNS) if entities is not None else None
+        result = analysis['text'], analysis['topics'], entities_df
+    else:
+        result = analyze_text_with_textrazor(text_or_url, api_key, is_url=is_url, language=language)
+    if result[1] is None:
+        raise AnalysisFailed(text_or_url)
+    return result
+
+def memo_analyze_text_with_textrazor(text_or_url, api_key, is_url, language):
+    # Un échec (clé absente, quota, erreur réseau) n'est pas mémorisé : il est retenté à la prochaine exécution
+    try:
+        return _memo_textrazor(text_or_url, api_key, is_url, language)
+    except AnalysisFailed:
+        return None, None, None
+
+def memo_generate_wordcloud(text, keywords_df):
+    # generate_wordcloud met lui-même ses PNG en cache
+    return generate_wordcloud(text, frequencies=keyword_frequencies(keywords_df)).getvalue()
+
+def clear_memoized_analyses():
+    """Invalide les résultats mémorisés et efface les analyses affichées."""
+    for memoized in (memo_extract_keywords, _memo_textrazor):
+        memoized.clear()
+    clear_wordcloud_cache()
+    for request_key in ('text_request', 'url_request', 'serp_request'):
+        st.session_state.pop(request_key, None)
+
+# Historique sur disque partagé entre processus ; chaque utilisateur ne voit que ses analyses
+@st.cache_resource
+def get_history_store():
+    return HistoryStore()
+
+def get_history_owner():
+    """Identifiant d'historique de l'utilisateur, gardé dans l'URL (?history=...) pour la retrouver."""
+    owner = st.query_params.get('history')
+    if not owner:
+        owner = uuid.uuid4().hex
+        st.query_params['history'] = owner
+    return owner
 
 # Fonction pour sauvegarder l'historique
 def save_analysis_history(data, analysis_type):
-    if 'analysis_history' not in st.session_state:
-        st.session_state.analysis_history = []
-    
-    history_entry = {
-        'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        'type': analysis_type,
-        'data': data
-    }
-    st.session_state.analysis_history.append(history_entry)
+    get_history_store().add(analysis_type, data, owner=get_history_owner())
+
+def stream_serp_analysis(keyword, location, valueserp_api_key, textrazor_api_key, user_url, language):
+    """Lance l'analyse SERP en affichant la progression et les agrégats partiels page par page."""
+    progress = st.progress(0.0, text="Récupération des SERP...")
+    live = st.empty()
+
+    def render(event):
+        if event['event'] == 'urls':
+            progress.progress(0.0, text=f"{len(event['urls'])} URLs à analyser...")
+        elif event['event'] == 'page':
+            # Événements locaux : analyse et agrégateur ; événements du service : statut et agrégats sérialisés
+            analysis = event.get('analysis')
+            duplicate_of = analysis.get('duplicate_of') if analysis else event.get('duplicate_of')
+            if duplicate_of:
+                status = f"quasi identique à {duplicate_of}"
+            elif analysis or event.get('status') == 'ok':
+                status = "analysée"
+            else:
+                status = "ignorée (échec)"
+            progress.progress(
+                event['completed'] / event['total'],
+                text=f"{event['completed']}/{event['total']} pages — {event['url']} {status}"
+            )
+            aggregator = event.get('aggregator')
+            if aggregator is not None:
+                pages = aggregator.pages
+                keywords_df, topics_df, entities_df = (
+                    aggregator.keywords_frame(), aggregator.topics_frame(), aggregator.entities_frame()
+                )
+            else:
+                partial = event['partial']
+                pages = partial['pages']
+                keywords_df, topics_df, entities_df = (
+                    pd.DataFrame(partial['keywords'], columns=KEYWORD_COLUMNS),
+                    pd.DataFrame(partial['topics'], columns=TOPIC_COLUMNS),
+                    pd.DataFrame(partial['entities'], columns=SERP_ENTITY_COLUMNS)
+                )
+            if not pages:
+                return
+            with live.container():
+                st.caption(f"Résultats partiels sur {pages} page(s)")
+                st.dataframe(keywords_df.sort_values(['urls_count', 'total_occurrences'], ascending=False).head(20))
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.dataframe(topics_df)
+                with col2:
+                    st.dataframe(entities_df)
+
+    try:
+        if service:
+            results = service.run('analyze_serp', on_event=render, keyword=keyword, location=location,
+                                  valueserp_api_key=valueserp_api_key, textrazor_api_key=textrazor_api_key,
+                                  user_url=user_url, language=language, time_budget=SERP_TIME_BUDGET)
+        else:
+            results = analyze_serp_results(keyword, location, valueserp_api_key, textrazor_api_key, user_url,
+                                           language, on_progress=render, time_budget=SERP_TIME_BUDGET)
+    finally:
+        progress.empty()
+        live.empty()
+    return results
 
 # Navigation principale
 st.sidebar.title("SEO Content Analyzer Pro")
@@ -86,7 +212,12 @@ page = st.sidebar.radio("Navigation", [
 with st.sidebar.expander("Configuration Globale"):
     max_keywords = st.number_input("Nombre max de mots-clés", 10, 200, 100)
     min_char_length = st.number_input("Longueur min des mots-clés", 3, 10, 3)
-    language = st.selectbox("Langue", ["fr", "en", "es", "de", "it"])
+    language = st.selectbox("Langue", list(DEFAULT_LANGUAGES))
+
+# Pré-construction des extracteurs YAKE (sans effet une fois le registre rempli ; inutile avec le service)
+if not service:
+    with timed("yake warm-up"):
+        warm_up(DEFAULT_LANGUAGES, tops=(DEFAULT_TOP, max_keywords))
 
 # Clés API dans la sidebar
 textrazor_api_key = st.sidebar.text_input("Clé API TextRazor", type="password")
@@ -98,16 +229,85 @@ if page == "Analyse de Texte":
     
     text_input = st.text_area("Entrez votre texte ici:", height=200)
     
-    if st.button("Analyser le texte"):
-        if text_input.strip():
+    if st.button("Analyser le texte") and text_input.strip():
+        st.session_state.text_request = {'text': text_input, 'saved': False}
+    
+    # Les résultats restent affichés (depuis le cache) lors des réexécutions suivantes
+    text_request = st.session_state.get('text_request')
+    if text_request:
+        analyzed_text = text_request['text']
+        
+        try:
             # Analyse YAKE
-            keywords_df = extract_keywords(text_input, language=language, max_keywords=max_keywords)
+            keywords_df = memo_extract_keywords(analyzed_text, language, max_keywords)
             
             # Analyse TextRazor
-            _, topics, entities_df = analyze_text_with_textrazor(text_input, textrazor_api_key)
-            
+            _, topics, entities_df = memo_analyze_text_with_textrazor(analyzed_text, textrazor_api_key, False,
+                                                                      language)
+        except SERVICE_ERRORS as e:
+            stop_on_service_error(e, 'text_request')
+        
+        # Affichage des résultats
+        st.subheader("Résultats de l'analyse")
+        
+        # Mots-clés
+        st.subheader("Mots-clés extraits")
+        st.dataframe(keywords_df)
+        
+        # Visualisations
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.plotly_chart(create_keywords_chart(keywords_df))
+        
+        with col2:
+            wordcloud_image = memo_generate_wordcloud(analyzed_text, keywords_df)
+            st.image(wordcloud_image)
+        
+        # Topics et Entités
+        if topics:
+            st.subheader("Topics identifiés")
+            st.write(", ".join(topics))
+        
+        if entities_df is not None and not entities_df.empty:
+            st.subheader("Entités extraites")
+            st.dataframe(entities_df)
+        
+        # Sauvegarde dans l'historique (une seule fois par analyse lancée)
+        if not text_request['saved']:
+            save_analysis_history({
+                'text': analyzed_text[:200] + '...',
+                'keywords': keywords_df.to_dict('records'),
+                'topics': topics,
+                'entities': entities_df.to_dict('records') if entities_df is not None and not entities_df.empty else []
+            }, 'text_analysis')
+            text_request['saved'] = True
+
+elif page == "Analyse d'URL":
+    st.title("Analyse de contenu via URL")
+    
+    url_input = st.text_input("Entrez l'URL ici:")
+    
+    if st.button("Analyser l'URL") and url_input.strip():
+        st.session_state.url_request = {'url': url_input, 'saved': False}
+    
+    url_request = st.session_state.get('url_request')
+    if url_request:
+        analyzed_url = url_request['url']
+        
+        try:
+            # Analyse TextRazor de l'URL
+            text, topics, entities_df = memo_analyze_text_with_textrazor(analyzed_url, textrazor_api_key, True,
+                                                                         language)
+            # Analyse YAKE du texte extrait
+            keywords_df = memo_extract_keywords(text, language, max_keywords) if text else None
+        except SERVICE_ERRORS as e:
+            stop_on_service_error(e, 'url_request')
+        
+        if text:
             # Affichage des résultats
-            st.subheader("Résultats de l'analyse")
+            st.subheader("Texte extrait")
+            st.write(text[:500] + "...")
             
             # Mots-clés
             st.subheader("Mots-clés extraits")
@@ -120,7 +320,7 @@ if page == "Analyse de Texte":
                 st.plotly_chart(create_keywords_chart(keywords_df))
             
             with col2:
-                wordcloud_image = generate_wordcloud(text_input)
+                wordcloud_image = memo_generate_wordcloud(text, keywords_df)
                 st.image(wordcloud_image)
             
             # Topics et Entités
@@ -132,63 +332,16 @@ if page == "Analyse de Texte":
                 st.subheader("Entités extraites")
                 st.dataframe(entities_df)
             
-            # Sauvegarde dans l'historique
-            save_analysis_history({
-                'text': text_input[:200] + '...',
-                'keywords': keywords_df.to_dict('records'),
-                'topics': topics,
-                'entities': entities_df.to_dict('records') if not entities_df.empty else []
-            }, 'text_analysis')
-
-elif page == "Analyse d'URL":
-    st.title("Analyse de contenu via URL")
-    
-    url_input = st.text_input("Entrez l'URL ici:")
-    
-    if st.button("Analyser l'URL"):
-        if url_input.strip():
-            # Analyse TextRazor de l'URL
-            text, topics, entities_df = analyze_text_with_textrazor(url_input, textrazor_api_key, is_url=True)
-            
-            if text:
-                # Analyse YAKE du texte extrait
-                keywords_df = extract_keywords(text, language=language, max_keywords=max_keywords)
-                
-                # Affichage des résultats
-                st.subheader("Texte extrait")
-                st.write(text[:500] + "...")
-                
-                # Mots-clés
-                st.subheader("Mots-clés extraits")
-                st.dataframe(keywords_df)
-                
-                # Visualisations
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.plotly_chart(create_keywords_chart(keywords_df))
-                
-                with col2:
-                    wordcloud_image = generate_wordcloud(text)
-                    st.image(wordcloud_image)
-                
-                # Topics et Entités
-                if topics:
-                    st.subheader("Topics identifiés")
-                    st.write(", ".join(topics))
-                
-                if not entities_df.empty:
-                    st.subheader("Entités extraites")
-                    st.dataframe(entities_df)
-                
-                # Sauvegarde dans l'historique
+            # Sauvegarde dans l'historique (une seule fois par analyse lancée)
+            if not url_request['saved']:
                 save_analysis_history({
-                    'url': url_input,
+                    'url': analyzed_url,
                     'text': text[:200] + '...',
                     'keywords': keywords_df.to_dict('records'),
                     'topics': topics,
                     'entities': entities_df.to_dict('records') if not entities_df.empty else []
                 }, 'url_analysis')
+                url_request['saved'] = True
 
 elif page == "Recherche SERP":
     st.title("Analyse des SERP")
@@ -197,109 +350,217 @@ elif page == "Recherche SERP":
     location_query = st.text_input("Entrez une localisation pour les SERP:")
     user_url = st.text_input("Votre URL (optionnel):")
     
-    if st.button("Analyser les SERP"):
-        if keyword_input and location_query:
-            results = analyze_serp_results(
-                keyword_input,
-                location_query,
-                valueserp_api_key,
-                textrazor_api_key,
-                user_url,
-                language
-            )
+    if st.button("Analyser les SERP") and keyword_input and location_query:
+        st.session_state.serp_request = {
+            'keyword': keyword_input,
+            'location': location_query,
+            'user_url': user_url,
+            'saved': False
+        }
+    
+    serp_request = st.session_state.get('serp_request')
+    if serp_request:
+        # Analyse en direct au premier affichage, puis réaffichage du résultat conservé
+        if 'results' not in serp_request:
+            try:
+                serp_request['results'] = stream_serp_analysis(
+                    serp_request['keyword'],
+                    serp_request['location'],
+                    valueserp_api_key,
+                    textrazor_api_key,
+                    serp_request['user_url'],
+                    language
+                )
+            except SERVICE_ERRORS as e:
+                stop_on_service_error(e, 'serp_request')
+        results = serp_request['results']
+        
+        if results:
+            st.subheader("Résultats de l'analyse SERP")
             
-            if results:
-                st.subheader("Résultats de l'analyse SERP")
-                
-                # URLs analysées
-                st.subheader("URLs analysées")
-                for idx, url in enumerate(results['urls'], 1):
-                    st.write(f"{idx}. {url}")
-                
-                # Mots-clés globaux
-                if results['keywords']:
-                    st.subheader("Analyse globale des mots-clés Yake")
-                    keywords_df = pd.DataFrame(results['keywords'])
-                    st.write("Note: total_occurrences représente le nombre total de fois où le mot-clé apparaît dans l'ensemble des URLs du top 10 des résultats Google")
-                    st.dataframe(keywords_df)
-                    
-                    # Visualisation des mots-clés
-                    st.plotly_chart(create_keywords_chart(keywords_df))
+            # URLs analysées
+            st.subheader("URLs analysées")
+            for idx, url in enumerate(results['urls'], 1):
+                st.write(f"{idx}. {url}")
+            
+            if results.get('duplicates'):
+                st.write("Pages quasi dupliquées (analyse réutilisée, exclues des agrégats) :")
+                st.dataframe(pd.DataFrame(results['duplicates']))
+            
+            if results.get('skipped'):
+                st.write("Pages non analysées :")
+                st.dataframe(pd.DataFrame(results['skipped']))
+            
+            # Mots-clés globaux
+            if results['keywords']:
+                st.subheader("Analyse globale des mots-clés Yake")
+                keywords_df = pd.DataFrame(results['keywords'])
+                st.write("Note: total_occurrences représente le nombre total de fois où le mot-clé apparaît dans l'ensemble des URLs du top 10 des résultats Google")
+                st.dataframe(keywords_df)
                 
-                # Topics globaux
-                if results['topics']:
-                    st.subheader("Topics principaux")
-                    topics_df = pd.DataFrame(results['topics'])
-                    st.dataframe(topics_df)
+                # Visualisation des mots-clés
+                st.plotly_chart(create_keywords_chart(keywords_df))
+            
+            # Topics globaux
+            if results['topics']:
+                st.subheader("Topics principaux")
+                topics_df = pd.DataFrame(results['topics'])
+                st.dataframe(topics_df)
+            
+            # Entités globales
+            if results['entities']:
+                st.subheader("Entités principales")
+                entities_df = pd.DataFrame(results['entities'])
+                st.dataframe(entities_df)
+            
+            # Analyse comparative avec l'URL de l'utilisateur
+            if results.get('comparison'):
+                st.subheader("Analyse comparative de votre URL")
+                comparison = results['comparison']
                 
-                # Entités globales
-                if results['entities']:
-                    st.subheader("Entités principales")
-                    entities_df = pd.DataFrame(results['entities'])
-                    st.dataframe(entities_df)
+                # Métriques de couverture
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Couverture des topics", f"{comparison['topic_coverage']:.1f}%")
+                with col2:
+                    st.metric("Couverture des entités", f"{comparison['entity_coverage']:.1f}%")
                 
-                # Analyse comparative avec l'URL de l'utilisateur
-                if results.get('comparison'):
-                    st.subheader("Analyse comparative de votre URL")
-                    comparison = results['comparison']
-                    
-                    # Métriques de couverture
+                # Similarité TF-IDF avec les pages des SERP
+                similarity = comparison.get('similarity')
+                if similarity:
                     col1, col2 = st.columns(2)
                     with col1:
-                        st.metric("Couverture des topics", f"{comparison['topic_coverage']:.1f}%")
+                        st.metric("Similarité avec le centroïde des SERP",
+                                  f"{similarity['centroid_similarity'] * 100:.1f}%")
                     with col2:
-                        st.metric("Couverture des entités", f"{comparison['entity_coverage']:.1f}%")
-                    
-                    # Mots-clés manquants
-                    if comparison['missing_keywords']:
-                        st.subheader("Mots-clés manquants importants")
-                        missing_kw_df = pd.DataFrame(comparison['missing_keywords'])
-                        st.dataframe(missing_kw_df)
-                    
-                    # Écarts de fréquence
-                    if comparison['keyword_gaps']:
-                        st.subheader("Mots-clés sous-utilisés")
-                        gaps_df = pd.DataFrame(comparison['keyword_gaps'])
-                        st.dataframe(gaps_df)
-                    
-                    # Topics manquants
-                    if comparison['missing_topics']:
-                        st.subheader("Topics manquants")
-                        missing_topics_df = pd.DataFrame(comparison['missing_topics'])
-                        st.dataframe(missing_topics_df)
-                    
-                    # Recommandations
-                    if comparison['recommendations']:
-                        st.subheader("Recommandations d'optimisation")
-                        for rec in comparison['recommendations']:
-                            priority_color = {
-                                'high': 'red',
-                                'medium': 'orange',
-                                'low': 'blue'
-                            }.get(rec['priority'], 'gray')
-                            
-                            st.markdown(f"""
-                            <div class="metric-card" style="border-left: 4px solid {priority_color}">
-                                <strong>Priorité {rec['priority']}</strong><br>
-                                {rec['message']}
-                            </div>
-                            """, unsafe_allow_html=True)
+                        st.metric("Moyenne des concurrents", f"{similarity['serp_avg_centroid_similarity'] * 100:.1f}%")
+                    st.write("Similarité avec chaque page des SERP :")
+                    st.dataframe(pd.DataFrame(similarity['competitors']))
+                    if similarity['term_gaps']:
+                        st.write("Termes plus présents dans les SERP que dans votre page :")
+                        st.dataframe(pd.DataFrame(similarity['term_gaps']))
+                
+                # Mots-clés manquants
+                if comparison['missing_keywords']:
+                    st.subheader("Mots-clés manquants importants")
+                    missing_kw_df = pd.DataFrame(comparison['missing_keywords'])
+                    st.dataframe(missing_kw_df)
                 
-                # Sauvegarde dans l'historique
+                # Écarts de fréquence
+                if comparison['keyword_gaps']:
+                    st.subheader("Mots-clés sous-utilisés")
+                    gaps_df = pd.DataFrame(comparison['keyword_gaps'])
+                    st.dataframe(gaps_df)
+                
+                # Topics manquants
+                if comparison['missing_topics']:
+                    st.subheader("Topics manquants")
+                    missing_topics_df = pd.DataFrame(comparison['missing_topics'])
+                    st.dataframe(missing_topics_df)
+                
+                # Recommandations
+                if comparison['recommendations']:
+                    st.subheader("Recommandations d'optimisation")
+                    for rec in comparison['recommendations']:
+                        priority_color = {
+                            'high': 'red',
+                            'medium': 'orange',
+                            'low': 'blue'
+                        }.get(rec['priority'], 'gray')
+                        
+                        st.markdown(f"""
+                        <div class="metric-card" style="border-left: 4px solid {priority_color}">
+                            <strong>Priorité {rec['priority']}</strong><br>
+                            {rec['message']}
+                        </div>
+                        """, unsafe_allow_html=True)
+            
+            # Audit de plusieurs pages face au profil de cette SERP (sans nouvelle analyse SERP)
+            with st.expander("Auditer plusieurs pages face à cette SERP"):
+                serp_profile = SerpProfile.from_serp_data(results)
+                audit_input = st.text_area("URLs à auditer (une par ligne):")
+                if st.button("Lancer l'audit") and audit_input.strip():
+                    audit_targets = [line.strip() for line in audit_input.splitlines() if line.strip()]
+                    with st.spinner(f"Audit de {len(audit_targets)} page(s)..."):
+                        if service:
+                            try:
+                                serp_request['audit'] = service.run('audit', profile=serp_profile.to_dict(),
+                                                                    urls=audit_targets,
+                                                                    textrazor_api_key=textrazor_api_key,
+                                                                    language=language)
+                            except SERVICE_ERRORS as e:
+                                st.error(f"Service d'analyse indisponible ou en échec : {e}")
+                        else:
+                            serp_request['audit'] = audit_urls(serp_profile, audit_targets, textrazor_api_key,
+                                                               language)
+                
+                if serp_request.get('audit'):
+                    audit_rows = []
+                    for report in serp_request['audit']:
+                        comparison = report.get('comparison')
+                        if comparison is None:
+                            audit_rows.append({'url': report['url'], 'erreur': report['error']})
+                            continue
+                        audit_rows.append({
+                            'url': report['url'],
+                            'topic_coverage': round(comparison['topic_coverage'], 1),
+                            'entity_coverage': round(comparison['entity_coverage'], 1),
+                            'missing_keywords': len(comparison['missing_keywords']),
+                            'keyword_gaps': len(comparison['keyword_gaps']),
+                            'top_missing': ', '.join(k['keyword'] for k in comparison['missing_keywords'][:5])
+                        })
+                    st.dataframe(pd.DataFrame(audit_rows))
+                    st.download_button(
+                        "Exporter l'audit (JSON)",
+                        json.dumps(serp_request['audit'], ensure_ascii=False),
+                        file_name=f"audit_{serp_request['keyword']}.json",
+                        mime="application/json"
+                    )
+                st.download_button(
+                    "Exporter le profil SERP (JSON)",
+                    json.dumps(serp_profile.to_dict(), ensure_ascii=False),
+                    file_name=f"profil_{serp_request['keyword']}.json",
+                    mime="application/json"
+                )
+            
+            # Temps passé dans chaque étape de l'analyse
+            if results.get('trace'):
+                with st.expander("Temps par étape"):
+                    timings_df = pd.DataFrame(summarize_spans(results['trace']))
+                    st.dataframe(timings_df.sort_values('total_s', ascending=False).round(3))
+                    st.download_button(
+                        "Exporter la trace (JSONL)",
+                        spans_to_jsonl(results['trace']),
+                        file_name=f"trace_{serp_request['keyword']}.jsonl",
+                        mime="application/x-ndjson"
+                    )
+            
+            # Sauvegarde dans l'historique (une seule fois par analyse lancée)
+            if not serp_request['saved']:
                 save_analysis_history({
-                    'keyword': keyword_input,
-                    'location': location_query,
-                    'user_url': user_url,
+                    'keyword': serp_request['keyword'],
+                    'location': serp_request['location'],
+                    'user_url': serp_request['user_url'],
                     'results': results
                 }, 'serp_analysis')
+                serp_request['saved'] = True
 
 elif page == "Historique des Analyses":
     st.title("Historique des Analyses")
     
-    if 'analysis_history' in st.session_state and st.session_state.analysis_history:
-        for entry in reversed(st.session_state.analysis_history):
-            with st.expander(f"{entry['type']} - {entry['date']}"):
-                st.json(entry['data'])
+    history_store = get_history_store()
+    history_entries = history_store.entries(get_history_owner())
+    if history_entries:
+        st.caption(f"{len(history_entries)} analyse(s) conservée(s) (maximum {history_store.max_entries})")
+        for entry in history_entries:
+            with st.expander(f"{entry['type']} - {entry['date']} - {entry['summary'].get('title', '')}"):
+                st.json(entry['summary'])
+                # Le contenu complet n'est lu sur le disque qu'à la demande
+                if st.checkbox("Afficher le détail complet", key=f"history_detail_{entry['id']}"):
+                    st.json(history_store.load(entry['id']) or {})
+        if st.button("Vider l'historique"):
+            history_store.clear(get_history_owner())
+            st.rerun()
     else:
         st.info("Aucun historique d'analyse disponible.")
 
@@ -309,6 +570,64 @@ elif page == "Configuration":
     st.subheader("Paramètres d'analyse")
     st.write("Configurez les paramètres globaux d'analyse dans la barre latérale.")
     
+    st.subheader("Résultats mémorisés")
+    st.write("Les analyses sont conservées en mémoire entre les interactions (au plus "
+             f"{MEMO_MAX_ENTRIES} par type, pendant {MEMO_TTL // 60} minutes).")
+    if st.button("Vider les résultats mémorisés"):
+        clear_memoized_analyses()
+    
+    # Avec le service, les caches et les limiteurs utilisés sont ceux du processus du service
+    service_health = None
+    if service:
+        st.subheader("Service d'analyse")
+        st.write(f"Analyses confiées au service {service.base_url}")
+        try:
+            service_health = service.health()
+        except SERVICE_ERRORS as e:
+            st.error(f"Service d'analyse indisponible : {e}")
+        else:
+            st.json({k: v for k, v in service_health.items() if k not in ('limits', 'caches')})
+    
+    for cache_name, cache_title, cache in [
+        ('pages', "Cache des pages", get_page_cache()),
+        ('textrazor', "Cache TextRazor", get_textrazor_cache()),
+        ('serp', "Cache ValueSERP", get_serp_cache())
+    ]:
+        st.subheader(cache_title)
+        if service:
+            if service_health is None:
+                continue
+            st.caption("Statistiques du service d'analyse")
+            cache_stats = service_health['caches'][cache_name]
+        else:
+            cache_stats = cache.stats()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Entrées", cache_stats['entries'])
+        with col2:
+            st.metric("Taux de succès", f"{cache_stats['hit_rate'] * 100:.1f}%")
+        with col3:
+            st.metric("Revalidations", cache_stats.get('revalidated', 0))
+        with col4:
+            st.metric("Taille", f"{cache_stats['bytes'] / (1024 * 1024):.1f} Mo")
+        if not service and st.button(f"Vider : {cache_title}"):
+            cache.clear()
+    
+    st.subheader("Limites des API")
+    if service:
+        if service_health is not None:
+            st.caption("Limiteurs du service d'analyse")
+            st.dataframe(pd.DataFrame([{'api': name, **stats} for name, stats in service_health['limits'].items()]))
+    else:
+        st.dataframe(pd.DataFrame([{'api': name, **get_limiter(name).stats()} for name in PROVIDER_LIMITS]))
+    
+    st.subheader("Démarrage")
+    timings = startup_timings()
+    if timings:
+        st.dataframe(pd.DataFrame(
+            [{'étape': name, 'durée (s)': round(seconds, 3)} for name, seconds in timings.items()]
+        ))
+    
     st.subheader("Clés API")
     st.write("""
     Pour utiliser toutes les fonctionnalités de l'application, vous devez configurer les clés API suivantes :
@@ -0,0 +1,258 @@
+"""Services locaux remplaçant ValueSERP, TextRazor et les pages web pendant les benchmarks."""
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Vocabulaire du corpus synthétique (les entités sont aussi reconnues par le stub TextRazor)
+WORDS = (
+    "référencement naturel contenu qualité moteur recherche google page site web lien "
+    "mot clé analyse stratégie audit technique balise titre description optimisation "
+    "utilisateur expérience mobile vitesse chargement indexation exploration robot "
+    "sémantique cocon maillage interne externe autorité domaine popularité netlinking "
+    "article blog rédaction éditorial thématique intention requête longue traîne "
+    "concurrence position classement trafic organique conversion taux clic résultat"
+).split()
+ENTITIES = ["Google", "Paris", "Lyon", "France", "Bing", "Wikipedia", "Marseille", "Europe"]
+TOPICS = ["Search engine optimization", "Digital marketing", "World Wide Web", "Content marketing",
+          "Online advertising", "Web design", "Information retrieval", "Marketing"]
+DEFAULT_PAGE_WORDS = (500, 2000, 8000, 20000)
+
+
+def synthetic_text(n_words, seed=0):
+    """Texte pseudo-aléatoire déterministe de `n_words` mots, découpé en phrases."""
+    rng = random.Random(seed)
+    sentences = []
+    remaining = n_words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 20))
+        words = [rng.choice(WORDS) for _ in range(length)]
+        if rng.random() < 0.3:
+            words[rng.randrange(length)] = rng.choice(ENTITIES)
+        sentences.append(" ".join(words).capitalize() + ".")
+        remaining -= length
+    return " ".join(sentences)
+
+
+def synthetic_html(n_words, seed=0):
+    text = synthetic_text(n_words, seed)
+    paragraphs = "".join(f"<p>{text[i:i + 600]}</p>" for i in range(0, len(text), 600))
+    return (
+        "<html><head><title>Page de test</title></head><body>"
+        "<nav><a href='/'>Accueil</a></nav>"
+        f"<article><h1>Page de test {seed}</h1>{paragraphs}</article>"
+        "<footer>Mentions légales</footer></body></html>"
+    )
+
+
+def generate_corpus(directory, page_words=DEFAULT_PAGE_WORDS, pages_per_size=3):
+    """Écrit un corpus de pages HTML de tailles variées et renvoie la liste des fichiers."""
+    os.makedirs(directory, exist_ok=True)
+    names = []
+    seed = 0
+    for n_words in page_words:
+        for _ in range(pages_per_size):
+            name = f"page_{n_words}_{seed}.html"
+            with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+                f.write(synthetic_html(n_words, seed))
+            names.append(name)
+            seed += 1
+    return names
+
+
+class LocalServices:
+    """Serveur HTTP local : pages du corpus sous /pages/ et faux ValueSERP sous /search.
+
+    `routes` associe d'autres chemins à des fonctions recevant le BaseHTTPRequestHandler,
+    pour simuler des réponses particulières (pages lentes, 429, etc.).
+    """
+
+    def __init__(self, corpus_dir, latency=0.0, routes=None):
+        self.corpus_dir = corpus_dir
+        self.latency = latency
+        self.routes = routes or {}
+        self.pages = sorted(name for name in os.listdir(corpus_dir) if name.endswith('.html'))
+        self.requests = 0
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self._server.server_port}{path}"
+
+    def page_urls(self):
+        return [self.url(f"/pages/{name}") for name in self.pages]
+
+    def _handler(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                services.requests += 1
+                if services.latency:
+                    time.sleep(services.latency)
+                parts = urlsplit(self.path)
+                if parts.path in services.routes:
+                    services.routes[parts.path](self)
+                elif parts.path == '/search':
+                    self._search(parse_qs(parts.query))
+                elif parts.path.startswith('/pages/'):
+                    self._page(os.path.basename(parts.path))
+                else:
+                    self.send_error(404)
+
+            def _search(self, query):
+                num = int(query.get('num', ['10'])[0])
+                urls = services.page_urls()
+                # Ordre dépendant du mot-clé, pour varier les SERP d'une requête à l'autre
+                offset = int(hashlib.sha256(query.get('q', [''])[0].encode('utf-8')).hexdigest(), 16) % len(urls)
+                links = (urls[offset:] + urls[:offset])[:num]
+                self._send(200, 'application/json', json.dumps({
+                    'organic_results': [{'position': i + 1, 'link': link} for i, link in enumerate(links)]
+                }).encode('utf-8'))
+
+            def _page(self, name):
+                path = os.path.join(services.corpus_dir, name)
+                if not os.path.exists(path):
+                    self.send_error(404)
+                    return
+                with open(path, 'rb') as f:
+                    self._send(200, 'text/html; charset=utf-8', f.read())
+
+            def _send(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _Topic:
+    def __init__(self, data):
+        self.label = data['label']
+        self.score = data.get('score', 1.0)
+
+
+class _Entity:
+    def __init__(self, data):
+        self.id = data.get('entityId')
+        self.matched_text = data.get('matchedText')
+        self.relevance_score = data.get('relevanceScore')
+        self.starting_position = data.get('startingPos')
+
+
+class _Response:
+    def __init__(self, data, cleaned_text=None):
+        self._data = data
+        self.cleaned_text = cleaned_text
+
+    def topics(self):
+        return [_Topic(t) for t in self._data.get('topics', [])]
+
+    def entities(self):
+        return [_Entity(e) for e in self._data.get('entities', [])]
+
+
+def synthetic_response(text):
+    """Réponse TextRazor plausible pour un texte : mentions des entités connues et topics."""
+    entities = []
+    for name in ENTITIES:
+        start = text.find(name)
+        while start != -1 and len(entities) < 500:
+            entities.append({
+                'entityId': name,
+                'matchedText': name,
+                'relevanceScore': round(0.3 + (start % 70) / 100, 3),
+                'startingPos': start
+            })
+            start = text.find(name, start + 1)
+    digest = int(hashlib.sha256(text.encode('utf-8')).hexdigest(), 16)
+    topics = [{'label': TOPICS[(digest >> i) % len(TOPICS)], 'score': 0.5} for i in range(4)]
+    return {'topics': topics, 'entities': entities}
+
+
+class TextRazorStub:
+    """Remplace le module textrazor : renvoie des réponses enregistrées.
+
+    Les réponses sont lues dans `responses_dir/<sha256 du texte>.json` ; une réponse absente
+    est synthétisée puis enregistrée, pour que les exécutions suivantes soient identiques.
+    """
+
+    def __init__(self, responses_dir=None, latency=0.0, fetch_url=None):
+        self.responses_dir = responses_dir
+        self.latency = latency
+        self.fetch_url = fetch_url
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def response_for(self, text):
+        if self.responses_dir is None:
+            return synthetic_response(text)
+        path = os.path.join(self.responses_dir, hashlib.sha256(text.encode('utf-8')).hexdigest() + '.json')
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        data = synthetic_response(text)
+        os.makedirs(self.responses_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        return data
+
+    def module(self):
+        stub = self
+
+        class TextRazor:
+            def __init__(self, api_key=None, extractors=None):
+                self.extractors = extractors or []
+
+            def set_language_override(self, language):
+                pass
+
+            def analyze(self, text):
+                with stub._lock:
+                    stub.calls += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                return _Response(stub.response_for(text))
+
+            def analyze_url(self, url):
+                text = stub.fetch_url(url) if stub.fetch_url else ''
+                response = self.analyze(text)
+                response.cleaned_text = text
+                return response
+
+        namespace = type(sys)('textrazor')
+        namespace.TextRazor = TextRazor
+        return namespace
+
+    @contextmanager
+    def installed(self):
+        """Installe le stub à la place du module `textrazor` le temps du bloc."""
+        previous = sys.modules.get('textrazor')
+        sys.modules['textrazor'] = self.module()
+        try:
+            yield self
+        finally:
+            if previous is None:
+                sys.modules.pop('textrazor', None)
+            else:
+                sys.modules['textrazor'] = previous
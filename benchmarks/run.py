@@ -0,0 +1,271 @@
+"""Benchmarks hors ligne du pipeline d'analyse.
+
+Usage :
+    python -m benchmarks.run --output benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --tolerance 0.25
+
+ValueSERP, TextRazor et les pages des SERP sont remplacés par des services locaux
+(voir benchmarks/fakes.py) : aucun appel payant n'est effectué.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from .fakes import DEFAULT_PAGE_WORDS, LocalServices, TextRazorStub, generate_corpus
+
+DEFAULT_KEYWORDS = ("audit seo", "référencement naturel", "netlinking", "maillage interne")
+STAGES = (
+    'extract_keywords',
+    'analyze_text_with_textrazor',
+    'analyze_url_content',
+    'analyze_serp_results',
+    'aggregate_serp',
+    'compare_with_serp'
+)
+
+
+def percentile(values, q):
+    """Percentile par interpolation linéaire (q entre 0 et 100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def measure(fn, items, iterations=3, setup=None):
+    """Chronomètre `fn` sur chaque élément, puis mesure le pic mémoire d'un passage complet."""
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for item in items:
+            if setup:
+                setup()
+            t0 = time.perf_counter()
+            try:
+                if fn(item) is None:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+
+    # Passage séparé : tracemalloc ralentit fortement le code mesuré
+    tracemalloc.start()
+    try:
+        for item in items:
+            if setup:
+                setup()
+            try:
+                fn(item)
+            except Exception:
+                pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'runs': len(latencies),
+        'errors': errors,
+        'mean_ms': 1000 * sum(latencies) / len(latencies) if latencies else None,
+        'p50_ms': 1000 * percentile(latencies, 50) if latencies else None,
+        'p95_ms': 1000 * percentile(latencies, 95) if latencies else None,
+        'throughput_per_s': len(latencies) / total if total else None,
+        'peak_memory_mb': peak / (1024 * 1024)
+    }
+
+
+def run_benchmarks(corpus_dir, iterations=3, page_latency=0.0, textrazor_latency=0.0,
+                   responses_dir=None, warm=False, keywords=DEFAULT_KEYWORDS, stages=STAGES):
+    """Exécute les benchmarks et renvoie un dictionnaire de résultats sérialisable."""
+    # Imports différés : YAKE_V4_CACHE_DIR doit être positionné avant le premier import
+    from utils import serp_analysis
+    from utils.cache import get_cache
+    from utils.page_cache import fetch_page
+    from utils.serp_aggregation import SerpAggregator
+    from utils.text_analysis import analyze_text_with_textrazor, extract_keywords
+
+    def clear_caches():
+        for name in ('pages', 'textrazor', 'serp'):
+            get_cache(name).clear()
+
+    setup = None if warm else clear_caches
+    stages_needing_serp = {'analyze_serp_results', 'aggregate_serp', 'compare_with_serp'}
+    results = {}
+
+    with LocalServices(corpus_dir, latency=page_latency) as services:
+        stub = TextRazorStub(
+            responses_dir,
+            latency=textrazor_latency,
+            fetch_url=lambda url: (fetch_page(url, use_cache=False) or {}).get('text') or ''
+        )
+        with stub.installed():
+            serp_analysis.VALUESERP_ENDPOINT = services.url('/search')
+            urls = services.page_urls()
+            texts = [t for t in (serp_analysis.extract_text_from_url(u, use_cache=False) for u in urls) if t]
+
+            if 'extract_keywords' in stages:
+                results['extract_keywords'] = measure(
+                    lambda text: extract_keywords(text, max_keywords=20), texts, iterations)
+            if 'analyze_text_with_textrazor' in stages:
+                results['analyze_text_with_textrazor'] = measure(
+                    lambda text: analyze_text_with_textrazor(text, 'benchmark', language='fr')[1],
+                    texts, iterations, setup)
+            if 'analyze_url_content' in stages:
+                results['analyze_url_content'] = measure(
+                    lambda url: serp_analysis.analyze_url_content(url, 'benchmark'), urls, iterations, setup)
+
+            serp_result = None
+            if stages_needing_serp & set(stages):
+                def serp(keyword):
+                    nonlocal serp_result
+                    result = serp_analysis.analyze_serp_results(keyword, 'Paris', 'benchmark', 'benchmark')
+                    serp_result = result or serp_result
+                    return result
+                stats = measure(serp, list(keywords), iterations, setup)
+                if 'analyze_serp_results' in stages:
+                    results['analyze_serp_results'] = stats
+
+            if 'aggregate_serp' in stages:
+                if serp_result:
+                    def aggregate(pages):
+                        aggregator = SerpAggregator()
+                        for page in pages:
+                            aggregator.add(page)
+                        return aggregator.snapshot()
+                    # Pages des SERP répétées pour simuler des profondeurs de 10, 30 et 100 résultats
+                    pages = serp_result['analyzed_results']
+                    results['aggregate_serp'] = measure(
+                        aggregate, [(pages * (depth // len(pages) + 1))[:depth] for depth in (10, 30, 100)],
+                        iterations)
+                else:
+                    results['aggregate_serp'] = {'skipped': "analyse SERP indisponible"}
+
+            if 'compare_with_serp' in stages:
+                user_data = serp_analysis.analyze_url_content(urls[0], 'benchmark')
+                if serp_result and user_data:
+                    # Avec les textes des pages : le modèle TF-IDF de similarité est mesuré aussi
+                    serp_data = {k: serp_result[k] for k in ('keywords', 'topics', 'entities', 'analyzed_results')}
+                    results['compare_with_serp'] = measure(
+                        lambda _: serp_analysis.compare_with_serp(user_data, serp_data),
+                        list(range(20)), iterations)
+                else:
+                    results['compare_with_serp'] = {'skipped': "analyse SERP indisponible"}
+
+        requests_served = services.requests
+
+    return {
+        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'iterations': iterations,
+            'pages': len(os.listdir(corpus_dir)),
+            'page_latency': page_latency,
+            'textrazor_latency': textrazor_latency,
+            'warm_caches': warm,
+            'keywords': list(keywords)
+        },
+        'http_requests': requests_served,
+        'textrazor_calls': stub.calls,
+        'results': results
+    }
+
+
+def compare_results(current, baseline, tolerance=0.25):
+    """Liste les étapes dont p50 ou p95 dépasse la référence de plus de `tolerance`."""
+    regressions = []
+    for stage, reference in baseline.get('results', {}).items():
+        measured = current['results'].get(stage)
+        if not measured:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if reference.get(metric) and measured.get(metric) and \
+                    measured[metric] > reference[metric] * (1 + tolerance):
+                regressions.append({
+                    'stage': stage,
+                    'metric': metric,
+                    'baseline': reference[metric],
+                    'current': measured[metric]
+                })
+    return regressions
+
+
+def print_report(report):
+    print(f"{'étape':<30}{'p50 ms':>10}{'p95 ms':>10}{'ops/s':>10}{'mém. Mo':>10}{'erreurs':>9}")
+    for stage, stats in report['results'].items():
+        if 'skipped' in stats:
+            print(f"{stage:<30}  ignorée : {stats['skipped']}")
+            continue
+        print(f"{stage:<30}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+              f"{stats['throughput_per_s']:>10.2f}{stats['peak_memory_mb']:>10.1f}{stats['errors']:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne de l'analyse SEO.")
+    parser.add_argument('--corpus', help="Répertoire de pages HTML (corpus synthétique par défaut)")
+    parser.add_argument('--page-words', type=int, nargs='+', default=list(DEFAULT_PAGE_WORDS),
+                        help="Tailles (en mots) des pages du corpus synthétique")
+    parser.add_argument('--textrazor-responses', help="Répertoire des réponses TextRazor enregistrées")
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--page-latency', type=float, default=0.0, help="Latence simulée des pages (s)")
+    parser.add_argument('--textrazor-latency', type=float, default=0.0, help="Latence simulée de TextRazor (s)")
+    parser.add_argument('--warm', action='store_true', help="Conserver les caches entre les mesures")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--output', help="Fichier JSON où écrire les résultats")
+    parser.add_argument('--compare', help="Fichier JSON de référence à comparer")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix='yake-v4-bench-')
+    os.environ['YAKE_V4_CACHE_DIR'] = os.path.join(work_dir, 'cache')
+    # Les services locaux ne sont pas soumis aux limites des API (voir utils.rate_limit)
+    for api in ('TEXTRAZOR', 'VALUESERP'):
+        os.environ[f'YAKE_V4_{api}_RATE'] = '1000'
+        os.environ[f'YAKE_V4_{api}_BURST'] = '1000'
+        os.environ[f'YAKE_V4_{api}_CONCURRENCY'] = '64'
+    try:
+        corpus_dir = args.corpus
+        if not corpus_dir:
+            corpus_dir = os.path.join(work_dir, 'corpus')
+            generate_corpus(corpus_dir, args.page_words)
+
+        report = run_benchmarks(
+            corpus_dir,
+            iterations=args.iterations,
+            page_latency=args.page_latency,
+            textrazor_latency=args.textrazor_latency,
+            responses_dir=args.textrazor_responses,
+            warm=args.warm,
+            stages=args.stages
+        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"RÉGRESSION {regression['stage']} {regression['metric']} : "
+                  f"{regression['baseline']:.1f} -> {regression['current']:.1f} ms", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
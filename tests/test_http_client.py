@@ -0,0 +1,102 @@
+"""Limites de `fetch_limited` (taille, type de contenu, échéance) face aux services locaux."""
+import os
+import tempfile
+import time
+import unittest
+
+os.environ.setdefault('YAKE_V4_CACHE_DIR', tempfile.mkdtemp(prefix='yake-v4-tests-'))
+
+from benchmarks.fakes import LocalServices, generate_corpus
+from utils.http_client import FetchRejected, fetch_limited
+
+
+def _send(handler, status, content_type, body, headers=()):
+    handler.send_response(status)
+    handler.send_header('Content-Type', content_type)
+    handler.send_header('Content-Length', str(len(body)))
+    for name, value in headers:
+        handler.send_header(name, value)
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+def _trickle(handler):
+    # Corps sans Content-Length envoyé 8 octets toutes les 0,2 s
+    handler.send_response(200)
+    handler.send_header('Content-Type', 'text/html')
+    handler.end_headers()
+    try:
+        for _ in range(200):
+            handler.wfile.write(b'<p>x</p>')
+            handler.wfile.flush()
+            time.sleep(0.2)
+    except OSError:
+        pass
+
+
+def _unannounced(handler):
+    # Corps volumineux sans Content-Length : seule la lecture en flux peut l'arrêter
+    handler.send_response(200)
+    handler.send_header('Content-Type', 'text/html')
+    handler.send_header('Connection', 'close')
+    handler.end_headers()
+    try:
+        handler.wfile.write(b'x' * 200_000)
+    except OSError:
+        pass
+
+
+class FetchLimitedTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.corpus_dir = tempfile.mkdtemp(prefix='yake-v4-corpus-')
+        generate_corpus(cls.corpus_dir, page_words=(200,), pages_per_size=1)
+        cls.services = LocalServices(cls.corpus_dir, routes={
+            '/pdf': lambda h: _send(h, 200, 'application/pdf', b'%PDF-1.4'),
+            '/big': lambda h: _send(h, 200, 'text/html', b'x' * 200_000),
+            '/unannounced': _unannounced,
+            '/trickle': _trickle,
+            '/unavailable': lambda h: _send(h, 503, 'text/html', b'', [('Retry-After', '120')])
+        }).__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.services.__exit__(None, None, None)
+
+    def test_page_is_returned_with_its_body(self):
+        response, body = fetch_limited(self.services.page_urls()[0])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'<article>', body)
+
+    def test_rejects_content_type(self):
+        with self.assertRaises(FetchRejected) as ctx:
+            fetch_limited(self.services.url('/pdf'))
+        self.assertEqual(ctx.exception.reason, 'content_type')
+
+    def test_rejects_announced_size(self):
+        with self.assertRaises(FetchRejected) as ctx:
+            fetch_limited(self.services.url('/big'), max_bytes=100_000)
+        self.assertEqual(ctx.exception.reason, 'too_large')
+
+    def test_rejects_streamed_size(self):
+        with self.assertRaises(FetchRejected) as ctx:
+            fetch_limited(self.services.url('/unannounced'), max_bytes=100_000)
+        self.assertEqual(ctx.exception.reason, 'too_large')
+
+    def test_deadline_interrupts_trickling_body(self):
+        started = time.monotonic()
+        with self.assertRaises(FetchRejected) as ctx:
+            fetch_limited(self.services.url('/trickle'), deadline=1.0)
+        self.assertEqual(ctx.exception.reason, 'deadline')
+        self.assertLess(time.monotonic() - started, 1.5)
+
+    def test_retry_after_beyond_deadline_is_not_awaited(self):
+        started = time.monotonic()
+        response, _ = fetch_limited(self.services.url('/unavailable'), deadline=2.0)
+        self.assertEqual(response.status_code, 503)
+        self.assertLess(time.monotonic() - started, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Recul de `RateLimiter` sur les réponses 429 d'un service local, et appels sans réponse."""
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+os.environ.setdefault('YAKE_V4_CACHE_DIR', tempfile.mkdtemp(prefix='yake-v4-tests-'))
+
+import requests
+
+from benchmarks.fakes import LocalServices, generate_corpus
+from utils.http_client import api_get
+from utils.rate_limit import DeadlineExceeded, RateLimiter
+
+
+class Overloaded:
+    """Route répondant 429 (Retry-After: 1) aux `failures` premières requêtes, puis 200."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def __call__(self, handler):
+        with self._lock:
+            self.requests.append(time.monotonic())
+            overloaded = len(self.requests) <= self.failures
+        handler.send_response(429 if overloaded else 200)
+        if overloaded:
+            handler.send_header('Retry-After', '1')
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', '2')
+        handler.end_headers()
+        handler.wfile.write(b'{}')
+
+
+def get_json(url):
+    response = api_get(url)
+    response.raise_for_status()
+    return response.json()
+
+
+class RateLimiterBackoffTest(unittest.TestCase):
+
+    def setUp(self):
+        corpus_dir = tempfile.mkdtemp(prefix='yake-v4-corpus-')
+        generate_corpus(corpus_dir, page_words=(200,), pages_per_size=1)
+        self.route = Overloaded(failures=2)
+        self.services = LocalServices(corpus_dir, routes={'/busy': self.route})
+        self.services.__enter__()
+        self.addCleanup(self.services.__exit__, None, None, None)
+
+    def test_backs_off_on_429(self):
+        limiter = RateLimiter('test-429', rate=100, burst=10, max_in_flight=8)
+        started = time.monotonic()
+        self.assertEqual(limiter.call(get_json, self.services.url('/busy')), {})
+
+        stats = limiter.stats()
+        self.assertEqual(stats['throttled'], 2)
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['failures'], 0)
+        self.assertLess(stats['limit'], 8)
+        # Retry-After respecté entre chaque essai
+        gaps = [b - a for a, b in zip(self.route.requests, self.route.requests[1:])]
+        self.assertTrue(all(gap >= 0.95 for gap in gaps), gaps)
+        self.assertGreaterEqual(time.monotonic() - started, 1.9)
+
+    def test_pause_is_shared_by_other_callers(self):
+        limiter = RateLimiter('test-429-shared', rate=100, burst=10, max_in_flight=8)
+        self.route.failures = 1
+        first = threading.Thread(target=limiter.call, args=(get_json, self.services.url('/busy')))
+        first.start()
+        while not limiter.stats()['throttled']:
+            time.sleep(0.01)
+        throttled_at = time.monotonic()
+        limiter.call(get_json, self.services.url('/busy'))
+        first.join()
+        self.assertGreaterEqual(time.monotonic() - throttled_at, 0.9)
+
+    def test_retry_after_beyond_deadline_is_raised(self):
+        limiter = RateLimiter('test-429-deadline', rate=100, burst=10, max_in_flight=8)
+        started = time.monotonic()
+        with self.assertRaises(requests.HTTPError):
+            limiter.call(get_json, self.services.url('/busy'), expires_at=started + 0.5)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(limiter.stats()['failures'], 1)
+
+
+class RateLimiterTimeoutTest(unittest.TestCase):
+
+    def test_hung_call_releases_its_slot(self):
+        limiter = RateLimiter('test-hung', rate=100, burst=10, max_in_flight=1, max_retries=0, timeout=0.3)
+        hung = threading.Event()
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            limiter.call(hung.wait)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(limiter.stats()['in_flight'], 0)
+        self.assertEqual(limiter.call(lambda: 'ok'), 'ok')
+        hung.set()
+
+    def test_wait_for_slot_stops_at_deadline(self):
+        limiter = RateLimiter('test-slot', rate=100, burst=10, max_in_flight=1)
+        with limiter.slot():
+            with self.assertRaises(DeadlineExceeded):
+                limiter.call(lambda: 'ok', expires_at=time.monotonic() + 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
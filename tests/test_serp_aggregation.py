@@ -0,0 +1,104 @@
+"""Agrégats vectorisés de `SerpAggregator` comparés à un groupby pandas ligne à ligne."""
+import random
+import unittest
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from benchmarks.fakes import ENTITIES, TOPICS, WORDS
+from utils.serp_aggregation import KEYWORD_COLUMNS, SerpAggregator
+
+
+def random_analysis(rng):
+    """Analyse de page aléatoire, au format de `analyze_url_content`."""
+    keywords = [' '.join(rng.sample(WORDS, rng.randint(1, 2))) for _ in range(rng.randint(0, 40))]
+    return {
+        'keywords': [
+            {'keyword': keyword, 'score': rng.random(), 'occurrences': rng.randint(0, 12)}
+            for keyword in dict.fromkeys(keywords)
+        ],
+        'topics': rng.sample(TOPICS, rng.randint(0, len(TOPICS))),
+        'entities': [
+            {'entity': entity, 'count': rng.randint(1, 9), 'relevance': rng.random()}
+            for entity in rng.sample(ENTITIES, rng.randint(0, len(ENTITIES)))
+        ]
+    }
+
+
+def reference_frames(analyses):
+    """Agrégats attendus, calculés avec pandas sur les lignes de toutes les pages."""
+    keyword_rows = [dict(kw, url=url) for url, analysis in enumerate(analyses) for kw in analysis['keywords']]
+    topic_rows = [{'topic': topic, 'url': url} for url, analysis in enumerate(analyses) for topic in analysis['topics']]
+    entity_rows = [entity for analysis in analyses for entity in analysis['entities']]
+
+    keywords = pd.DataFrame(keyword_rows).groupby('keyword').agg(
+        avg_score=('score', 'mean'),
+        total_occurrences=('occurrences', 'sum'),
+        min_occurrences=('occurrences', 'min'),
+        max_occurrences=('occurrences', 'max'),
+        std_occurrences=('occurrences', 'std'),
+        urls_count=('url', 'nunique')
+    ).reset_index()
+    topics = pd.DataFrame(topic_rows).groupby('topic').agg(count=('url', 'nunique')).reset_index()
+    topics['avg_score'] = topics['count'] / len(analyses)
+    entities = pd.DataFrame(entity_rows).groupby('entity').agg(
+        total_count=('count', 'sum'),
+        avg_relevance=('relevance', 'mean')
+    ).reset_index()
+    return keywords, topics, entities
+
+
+class SerpAggregatorTest(unittest.TestCase):
+
+    def assertMatchesReference(self, aggregator, analyses):
+        expected = reference_frames(analyses)
+        actual = (aggregator.keywords_frame(), aggregator.topics_frame(), aggregator.entities_frame())
+        for frame, reference in zip(actual, expected):
+            assert_frame_equal(frame.reset_index(drop=True), reference, check_dtype=False)
+
+    def test_matches_groupby_reference(self):
+        rng = random.Random(7)
+        analyses = [random_analysis(rng) for _ in range(30)]
+        aggregator = SerpAggregator()
+        for analysis in analyses:
+            aggregator.add(analysis)
+        self.assertMatchesReference(aggregator, analyses)
+
+    def test_partial_frames_follow_each_page(self):
+        rng = random.Random(11)
+        analyses = [random_analysis(rng) for _ in range(8)]
+        aggregator = SerpAggregator()
+        for count, analysis in enumerate(analyses, 1):
+            aggregator.add(analysis)
+            self.assertMatchesReference(aggregator, analyses[:count])
+
+    def test_remove_and_replace_match_fresh_aggregator(self):
+        rng = random.Random(13)
+        pages = {f"https://example.com/{i}": random_analysis(rng) for i in range(12)}
+        aggregator = SerpAggregator()
+        for url, analysis in pages.items():
+            aggregator.add(analysis, key=url)
+        aggregator.keywords_frame()
+
+        for url in list(pages)[::3]:
+            aggregator.remove(url)
+            del pages[url]
+        replaced = next(iter(pages))
+        pages[replaced] = random_analysis(rng)
+        aggregator.add(pages[replaced], key=replaced)
+
+        self.assertEqual(aggregator.pages, len(pages))
+        fresh = SerpAggregator()
+        for analysis in pages.values():
+            fresh.add(analysis)
+        for name in ('keywords_frame', 'topics_frame', 'entities_frame'):
+            assert_frame_equal(getattr(aggregator, name)(), getattr(fresh, name)(), check_dtype=False)
+
+    def test_empty_aggregator_has_columns(self):
+        snapshot = SerpAggregator().snapshot()
+        self.assertEqual(snapshot, {'keywords': [], 'topics': [], 'entities': []})
+        self.assertEqual(list(SerpAggregator().keywords_frame().columns), KEYWORD_COLUMNS)
+
+
+if __name__ == '__main__':
+    unittest.main()
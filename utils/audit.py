@@ -0,0 +1,80 @@
+"""Audit de plusieurs pages d'un site face à une même SERP, sans interface Streamlit.
+
+Usage :
+    python -m utils.audit "mot-clé" Paris urls.txt -o audit.jsonl --save-profile profil.json
+    python -m utils.audit --profile profil.json urls.txt -o audit.jsonl
+
+La SERP est analysée une seule fois et compilée en profil (voir `utils.serp_profile`),
+éventuellement enregistré pour les audits suivants ; chaque page du fichier d'URLs (une
+par ligne) est ensuite analysée et comparée au profil. Une ligne JSON est écrite par page.
+"""
+import argparse
+import json
+import os
+import sys
+from .serp_analysis import DEFAULT_MAX_PER_HOST, DEFAULT_MAX_WORKERS, analyze_serp_results, audit_urls
+from .serp_profile import SerpProfile
+
+
+def read_urls(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def summarize_report(report):
+    """Ligne de synthèse d'un rapport d'audit pour la console."""
+    if 'error' in report:
+        return f"[erreur] {report['url']} ({report.get('reason') or 'inconnue'})"
+    comparison = report['comparison']
+    return (f"[ok] {report['url']} topics {comparison['topic_coverage']:.0f}% "
+            f"entités {comparison['entity_coverage']:.0f}% "
+            f"mots-clés manquants {len(comparison['missing_keywords'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit de pages face à un profil SERP (URLs -> JSONL).")
+    parser.add_argument('targets', nargs='+', help="[mot-clé localisation] fichier d'URLs")
+    parser.add_argument('-o', '--output', required=True, help="Fichier JSONL de sortie")
+    parser.add_argument('--profile', help="Profil SERP déjà enregistré (au lieu de mot-clé et localisation)")
+    parser.add_argument('--save-profile', help="Fichier JSON où enregistrer le profil SERP")
+    parser.add_argument('--language', default='fr')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Nombre de pages analysées simultanément")
+    parser.add_argument('--max-per-host', type=int, default=DEFAULT_MAX_PER_HOST)
+    parser.add_argument('--valueserp-api-key', default=os.environ.get('VALUESERP_API_KEY'))
+    parser.add_argument('--textrazor-api-key', default=os.environ.get('TEXTRAZOR_API_KEY'))
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        if len(args.targets) != 1:
+            parser.error("avec --profile, seul le fichier d'URLs est attendu")
+        profile = SerpProfile.load(args.profile)
+    else:
+        if len(args.targets) != 3:
+            parser.error("mot-clé, localisation et fichier d'URLs attendus")
+        if not args.valueserp_api_key:
+            parser.error("clé ValueSERP manquante (--valueserp-api-key ou VALUESERP_API_KEY)")
+        keyword, location = args.targets[:2]
+        serp = analyze_serp_results(keyword, location, args.valueserp_api_key, args.textrazor_api_key,
+                                    language=args.language, max_workers=args.concurrency,
+                                    max_per_host=args.max_per_host)
+        if not serp:
+            sys.exit("Analyse SERP impossible")
+        profile = SerpProfile.from_serp_data(serp)
+    if args.save_profile:
+        profile.save(args.save_profile)
+
+    urls = read_urls(args.targets[-1])
+    with open(args.output, 'w', encoding='utf-8') as output:
+        def write(report):
+            output.write(json.dumps(report, ensure_ascii=False) + '\n')
+            output.flush()
+            print(summarize_report(report), file=sys.stderr)
+
+        audit_urls(profile, urls, args.textrazor_api_key, args.language, args.concurrency, args.max_per_host,
+                   on_report=write)
+    print(f"{len(urls)} page(s) auditée(s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
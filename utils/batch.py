@@ -0,0 +1,210 @@
+"""Analyse SERP en lot, sans interface Streamlit.
+
+Usage :
+    python -m utils.batch mots_cles.csv -o resultats.jsonl --language fr --concurrency 20
+
+Le fichier d'entrée est un CSV (colonnes keyword, location et user_url optionnelle) ou un
+JSONL avec les mêmes champs. Chaque mot-clé terminé produit immédiatement une ligne JSON
+dans le fichier de sortie ; une relance avec le même fichier de sortie reprend là où
+l'exécution précédente s'était arrêtée.
+"""
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from .serp_analysis import DEFAULT_MAX_PER_HOST, HostLimiter, analyze_serp_results
+from .tracing import spans_to_jsonl
+from .yake_workers import get_process_pool
+
+DEFAULT_CONCURRENCY = 20
+DEFAULT_KEYWORD_CONCURRENCY = 4
+
+
+def job_key(job):
+    return (job['keyword'], job['location'], job.get('user_url') or '')
+
+
+def read_jobs(path):
+    """Lit les requêtes une à une depuis un CSV ou un JSONL, sans tout charger en mémoire."""
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.endswith('.jsonl') or path.endswith('.ndjson'):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            keyword = (row.get('keyword') or '').strip()
+            location = (row.get('location') or '').strip()
+            if not keyword or not location:
+                continue
+            yield {
+                'keyword': keyword,
+                'location': location,
+                'user_url': (row.get('user_url') or '').strip() or None
+            }
+
+
+def read_completed(output_path):
+    """Clés des requêtes déjà traitées avec succès dans un fichier de sortie existant."""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Dernière ligne tronquée par une interruption
+                continue
+            if record.get('status') == 'ok':
+                completed.add(job_key(record))
+    return completed
+
+
+def compact_result(result):
+    """Retire le texte intégral des pages et la trace pour garder des enregistrements légers."""
+    compact = {k: v for k, v in result.items() if k != 'trace'}
+    compact['analyzed_results'] = [
+        {k: v for k, v in page.items() if k != 'text'}
+        for page in result.get('analyzed_results', [])
+    ]
+    return compact
+
+
+def _run_job(job, valueserp_api_key, textrazor_api_key, language, url_executor, host_limiter, yake_backend,
+             duplicate_policy, time_budget):
+    record = dict(job)
+    try:
+        result = analyze_serp_results(
+            job['keyword'],
+            job['location'],
+            valueserp_api_key,
+            textrazor_api_key,
+            job.get('user_url'),
+            language,
+            executor=url_executor,
+            host_limiter=host_limiter,
+            yake_backend=yake_backend,
+            duplicate_policy=duplicate_policy,
+            time_budget=time_budget
+        )
+        if result:
+            record.update({'status': 'ok', 'result': compact_result(result), 'trace': result.get('trace')})
+        else:
+            record.update({'status': 'error', 'error': "Aucun résultat d'analyse"})
+    except Exception as e:
+        record.update({'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+    record['finished_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return record
+
+
+def run_batch(input_path, output_path, valueserp_api_key, textrazor_api_key, language="fr",
+              concurrency=DEFAULT_CONCURRENCY, keyword_concurrency=DEFAULT_KEYWORD_CONCURRENCY,
+              max_per_host=DEFAULT_MAX_PER_HOST, yake_processes=None, on_record=None, trace_output=None,
+              duplicate_policy="drop", time_budget=None):
+    """Analyse toutes les requêtes du fichier d'entrée et écrit une ligne JSON par mot-clé.
+
+    `concurrency` est le budget global de téléchargements/analyses d'URLs simultanés,
+    partagé par tous les mots-clés ; `keyword_concurrency` borne le nombre de mots-clés en
+    cours. Seules les requêtes en cours sont gardées en mémoire. Avec `yake_processes`
+    (0 : un processus par cœur disponible), l'extraction YAKE est répartie sur un pool
+    de processus. Avec `trace_output`, les spans de chaque analyse (voir `utils.tracing`)
+    sont ajoutés à ce fichier JSONL. `time_budget` borne la durée de chaque analyse (voir
+    `analyze_serp_results`).
+    Renvoie le nombre d'enregistrements écrits.
+    """
+    completed = read_completed(output_path)
+    yake_backend = None
+    if yake_processes is not None:
+        get_process_pool(yake_processes or None)
+        yake_backend = 'process'
+    host_limiter = HostLimiter(max_per_host)
+    written = 0
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as url_executor, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=keyword_concurrency) as keyword_executor, \
+            open(output_path, 'a', encoding='utf-8') as output, \
+            open(trace_output or os.devnull, 'a', encoding='utf-8') as traces:
+
+        pending = set()
+
+        def drain(return_when):
+            nonlocal pending, written
+            done, pending = concurrent.futures.wait(pending, return_when=return_when)
+            for future in done:
+                record = future.result()
+                spans = record.pop('trace', None)
+                if trace_output and spans:
+                    traces.write(spans_to_jsonl(spans))
+                    traces.flush()
+                output.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                output.flush()
+                written += 1
+                if on_record:
+                    on_record(record)
+
+        for job in read_jobs(input_path):
+            if job_key(job) in completed:
+                continue
+            if len(pending) >= keyword_concurrency * 2:
+                drain(concurrent.futures.FIRST_COMPLETED)
+            pending.add(keyword_executor.submit(
+                _run_job, job, valueserp_api_key, textrazor_api_key, language, url_executor, host_limiter,
+                yake_backend, duplicate_policy, time_budget
+            ))
+
+        if pending:
+            drain(concurrent.futures.ALL_COMPLETED)
+
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse SERP en lot (CSV/JSONL -> JSONL).")
+    parser.add_argument('input', help="Fichier CSV ou JSONL (keyword, location, user_url)")
+    parser.add_argument('-o', '--output', required=True, help="Fichier JSONL de sortie (reprise automatique)")
+    parser.add_argument('--language', default='fr')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help="Budget global d'URLs analysées simultanément")
+    parser.add_argument('--keyword-concurrency', type=int, default=DEFAULT_KEYWORD_CONCURRENCY,
+                        help="Nombre de mots-clés traités simultanément")
+    parser.add_argument('--max-per-host', type=int, default=DEFAULT_MAX_PER_HOST)
+    parser.add_argument('--yake-processes', type=int, nargs='?', const=0, default=None,
+                        help="Extraction YAKE dans un pool de processus (sans valeur : un par cœur)")
+    parser.add_argument('--duplicate-policy', choices=('drop', 'keep', 'off'), default='drop',
+                        help="Pages quasi dupliquées : exclues des agrégats, comptées, ou non détectées")
+    parser.add_argument('--time-budget', type=float,
+                        help="Durée maximale (s) de l'analyse d'un mot-clé ; les pages non terminées sont ignorées")
+    parser.add_argument('--trace-output', help="Fichier JSONL où ajouter les temps par étape")
+    parser.add_argument('--valueserp-api-key', default=os.environ.get('VALUESERP_API_KEY'))
+    parser.add_argument('--textrazor-api-key', default=os.environ.get('TEXTRAZOR_API_KEY'))
+    args = parser.parse_args(argv)
+
+    if not args.valueserp_api_key:
+        parser.error("clé ValueSERP manquante (--valueserp-api-key ou VALUESERP_API_KEY)")
+
+    def report(record):
+        print(f"[{record['status']}] {record['keyword']} ({record['location']})", file=sys.stderr)
+
+    written = run_batch(
+        args.input,
+        args.output,
+        args.valueserp_api_key,
+        args.textrazor_api_key,
+        language=args.language,
+        concurrency=args.concurrency,
+        keyword_concurrency=args.keyword_concurrency,
+        max_per_host=args.max_per_host,
+        yake_processes=args.yake_processes,
+        on_record=report,
+        trace_output=args.trace_output,
+        duplicate_policy=args.duplicate_policy,
+        time_budget=args.time_budget
+    )
+    print(f"{written} mot(s)-clé(s) analysé(s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# Répertoire des caches persistants (surchargeable par variable d'environnement)
+DEFAULT_CACHE_DIR = os.environ.get(
+    'YAKE_V4_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'yake-v4')
+)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+class CacheEntry:
+    """Valeur lue dans un cache disque, avec sa date d'enregistrement."""
+
+    def __init__(self, value, stored_at):
+        self.value = value
+        self.stored_at = stored_at
+
+    def age(self):
+        return time.time() - self.stored_at
+
+
+class DiskCache:
+    """Cache clé/valeur persistant dans SQLite.
+
+    Les valeurs (sérialisables en JSON) sont compressées avec zlib. Les entrées expirent
+    après `ttl` secondes (None : jamais) et les moins récemment lues sont évincées dès que
+    la taille totale dépasse `max_bytes`.
+    """
+
+    def __init__(self, path, ttl=None, max_bytes=DEFAULT_MAX_BYTES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+            'stored_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)')
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'writes': 0, 'evictions': 0}
+
+    def is_fresh(self, entry, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        return ttl is None or entry.age() < ttl
+
+    def get_entry(self, key):
+        """Renvoie l'entrée brute (même expirée) ou None, sans mettre à jour les statistiques."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, stored_at FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (time.time(), key))
+        return CacheEntry(json.loads(zlib.decompress(row[0])), row[1])
+
+    def get(self, key, ttl=None):
+        """Renvoie la valeur si elle est présente et non expirée, sinon None."""
+        entry = self.get_entry(key)
+        if entry is None:
+            self.record('misses')
+            return None
+        if not self.is_fresh(entry, ttl):
+            self.record('stale')
+            return None
+        self.record('hits')
+        return entry.value
+
+    def set(self, key, value):
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, blob, len(blob), now, now)
+            )
+            self._stats['writes'] += 1
+            self._evict()
+
+    def touch(self, key):
+        """Remet à zéro l'âge d'une entrée (par exemple après une revalidation 304)."""
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                'UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?', (now, now, key)
+            )
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM entries')
+
+    def record(self, event):
+        with self._lock:
+            self._stats[event] = self._stats.get(event, 0) + 1
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute('SELECT key, size FROM entries ORDER BY accessed_at').fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            total -= size
+            self._stats['evictions'] += 1
+
+    def stats(self):
+        """Statistiques d'utilisation du cache (compteurs du processus et occupation disque)."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries'
+            ).fetchone()
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses'] + stats['stale']
+        stats.update({
+            'entries': entries,
+            'bytes': size,
+            'hit_rate': stats['hits'] / lookups if lookups else 0.0
+        })
+        return stats
+
+
+def _env_number(variable, default):
+    value = os.environ.get(variable)
+    return float(value) if value else default
+
+
+def get_cache(name, ttl=None, max_bytes=DEFAULT_MAX_BYTES, cache_dir=None):
+    """Renvoie le cache disque partagé `name` (créé au premier appel).
+
+    L'expiration et la taille maximale peuvent être surchargées par les variables
+    d'environnement YAKE_V4_<NAME>_CACHE_TTL et YAKE_V4_<NAME>_CACHE_MAX_BYTES.
+    """
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            prefix = f"YAKE_V4_{name.upper()}_CACHE"
+            ttl = _env_number(f"{prefix}_TTL", ttl)
+            max_bytes = _env_number(f"{prefix}_MAX_BYTES", max_bytes)
+            path = os.path.join(cache_dir or DEFAULT_CACHE_DIR, f"{name}.sqlite")
+            cache = DiskCache(path, ttl=ttl, max_bytes=max_bytes)
+            _caches[name] = cache
+        return cache
@@ -0,0 +1,69 @@
+import re
+
+DEFAULT_CHUNK_WORDS = 2000
+DEFAULT_OVERLAP_SENTENCES = 2
+# Taille des blocs lus dans la source, et longueur maximale d'une « phrase » sans ponctuation
+BLOCK_CHARS = 64 * 1024
+MAX_SENTENCE_CHARS = 4 * 1024
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?…])\s+|\n\s*\n")
+_WORD_RE = re.compile(r"\w+")
+
+
+def iter_blocks(source, block_chars=BLOCK_CHARS):
+    """Lit une source de texte par blocs : chaîne, fichier ouvert ou itérable de chaînes."""
+    if isinstance(source, str):
+        for start in range(0, len(source), block_chars):
+            yield source[start:start + block_chars]
+    elif hasattr(source, 'read'):
+        for block in iter(lambda: source.read(block_chars), ''):
+            yield block
+    else:
+        for block in source:
+            yield block
+
+
+def iter_sentences(source, block_chars=BLOCK_CHARS, max_sentence_chars=MAX_SENTENCE_CHARS):
+    """Découpe une source en phrases sans jamais charger plus d'un bloc à la fois.
+
+    Un passage sans ponctuation plus long que `max_sentence_chars` est coupé sur un espace.
+    """
+    buffer = ''
+    for block in iter_blocks(source, block_chars):
+        buffer += block
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(buffer):
+            sentence = buffer[start:match.start()].strip()
+            if sentence:
+                yield sentence
+            start = match.end()
+        buffer = buffer[start:]
+        while len(buffer) > max_sentence_chars:
+            cut = buffer.rfind(' ', 0, max_sentence_chars)
+            cut = cut if cut > 0 else max_sentence_chars
+            yield buffer[:cut].strip()
+            buffer = buffer[cut:]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def iter_chunks(source, chunk_words=DEFAULT_CHUNK_WORDS, overlap_sentences=DEFAULT_OVERLAP_SENTENCES):
+    """Regroupe les phrases d'une source en fenêtres d'environ `chunk_words` mots.
+
+    Génère des couples (contexte, corps) : le corps contient les nouvelles phrases de la
+    fenêtre, le contexte les `overlap_sentences` dernières phrases de la fenêtre précédente,
+    pour que les expressions à cheval sur deux fenêtres restent visibles.
+    """
+    context = []
+    body = []
+    words = 0
+    for sentence in iter_sentences(source):
+        body.append(sentence)
+        words += len(_WORD_RE.findall(sentence))
+        if words >= chunk_words:
+            yield ' '.join(context), ' '.join(body)
+            context = body[-overlap_sentences:] if overlap_sentences else []
+            body = []
+            words = 0
+    if body:
+        yield ' '.join(context), ' '.join(body)
@@ -0,0 +1,97 @@
+import threading
+import zlib
+import numpy as np
+from concurrent.futures import Future, TimeoutError
+from .text_analysis import tokenize
+
+DEFAULT_DUPLICATE_THRESHOLD = 0.8
+NUM_PERM = 64
+SHINGLE_SIZE = 5
+# Découpage LSH de la signature : 16 bandes de 4 valeurs (candidats dès ~50 % de similarité)
+LSH_BANDS = 16
+# Attente maximale de l'analyse d'un représentant (YAKE et un appel TextRazor borné)
+WAIT_TIMEOUT = 90
+
+_MAX_HASH = np.uint64((1 << 64) - 1)
+# Permutations (a·x + b) mod 2^64, avec a impair : le dépassement des uint64 fait le modulo
+_rng = np.random.default_rng(20240601)
+_PERM_A = _rng.integers(0, 1 << 63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_PERM_B = _rng.integers(0, 1 << 63, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingle_hashes(text, shingle_size=SHINGLE_SIZE):
+    """Empreintes (CRC32) des n-grammes de mots du texte, sans doublons."""
+    tokens = tokenize(text)
+    if len(tokens) < shingle_size:
+        shingles = {' '.join(tokens)} if tokens else set()
+    else:
+        shingles = {' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)}
+    return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signature(text, shingle_size=SHINGLE_SIZE):
+    """Signature MinHash (NUM_PERM valeurs) estimant la similarité de Jaccard des shingles."""
+    hashes = shingle_hashes(text, shingle_size)
+    signature = np.full(NUM_PERM, _MAX_HASH, dtype=np.uint64)
+    # Par blocs, pour borner la matrice shingles × permutations
+    for start in range(0, len(hashes), 4096):
+        permuted = hashes[start:start + 4096, None] * _PERM_A + _PERM_B
+        signature = np.minimum(signature, permuted.min(axis=0))
+    return signature
+
+
+def estimate_similarity(signature_a, signature_b):
+    return float(np.mean(signature_a == signature_b))
+
+
+class NearDuplicateIndex:
+    """Regroupe les pages quasi identiques d'une analyse au fil de leur téléchargement.
+
+    La première page d'un groupe en est le représentant : elle est analysée normalement
+    puis publie son analyse ; les suivantes (similarité estimée >= `threshold`) attendent
+    cette analyse et la réutilisent au lieu de refaire YAKE et TextRazor.
+    """
+
+    def __init__(self, threshold=DEFAULT_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._signatures = {}
+        self._buckets = {}
+        self._analyses = {}
+
+    def _bands(self, signature):
+        rows = NUM_PERM // LSH_BANDS
+        return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(LSH_BANDS)]
+
+    def claim(self, url, text):
+        """Renvoie (url du représentant, similarité) si la page double une page déjà vue.
+
+        Sinon la page devient représentante et doit appeler `publish` une fois analysée.
+        """
+        signature = minhash_signature(text)
+        bands = self._bands(signature)
+        with self._lock:
+            candidates = {other for key in bands for other in self._buckets.get(key, ())}
+            best = max(
+                ((estimate_similarity(signature, self._signatures[other]), other) for other in candidates),
+                default=None
+            )
+            if best is not None and best[0] >= self.threshold:
+                return best[1], best[0]
+
+            self._signatures[url] = signature
+            self._analyses[url] = Future()
+            for key in bands:
+                self._buckets.setdefault(key, []).append(url)
+        return None
+
+    def publish(self, url, analysis):
+        """Publie l'analyse d'un représentant (None si elle a échoué)."""
+        self._analyses[url].set_result(analysis)
+
+    def wait(self, url, timeout=WAIT_TIMEOUT):
+        """Attend et renvoie l'analyse du représentant `url` (None après `timeout` secondes)."""
+        try:
+            return self._analyses[url].result(timeout)
+        except TimeoutError:
+            return None
@@ -0,0 +1,91 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import yake
+
+# Langues proposées dans la barre latérale de l'application
+DEFAULT_LANGUAGES = ("fr", "en", "es", "de", "it")
+DEFAULT_NGRAM_SIZE = 3
+DEFAULT_DEDUP_LIM = 0.9
+DEFAULT_TOP = 20
+DEFAULT_MAX_EXTRACTORS = 32
+
+# Registre LRU : (langue, n, dedupLim, top) -> (extracteur, verrou)
+_extractors = OrderedDict()
+_registry_lock = threading.Lock()
+_max_extractors = DEFAULT_MAX_EXTRACTORS
+
+
+def _reset_locks_after_fork():
+    """Recrée les verrous dans un processus fils (ils peuvent avoir été copiés verrouillés)."""
+    global _registry_lock
+    _registry_lock = threading.Lock()
+    for key, (extractor, _) in list(_extractors.items()):
+        _extractors[key] = (extractor, threading.Lock())
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+
+def _get_entry(language, n, dedup_lim, top):
+    key = (language, int(n), float(dedup_lim), int(top))
+    with _registry_lock:
+        entry = _extractors.get(key)
+        if entry is not None:
+            _extractors.move_to_end(key)
+            return entry
+
+    # Construction hors verrou : le chargement des stopwords ne bloque pas les autres configurations
+    extractor = yake.KeywordExtractor(lan=language, n=key[1], dedupLim=key[2], top=key[3])
+
+    with _registry_lock:
+        entry = _extractors.get(key)
+        if entry is None:
+            entry = (extractor, threading.Lock())
+            _extractors[key] = entry
+        _extractors.move_to_end(key)
+        while len(_extractors) > _max_extractors:
+            _extractors.popitem(last=False)
+        return entry
+
+
+def get_extractor(language="fr", n=DEFAULT_NGRAM_SIZE, dedup_lim=DEFAULT_DEDUP_LIM, top=DEFAULT_TOP):
+    """Renvoie l'extracteur YAKE pré-construit pour cette configuration."""
+    return _get_entry(language, n, dedup_lim, top)[0]
+
+
+@contextmanager
+def checkout_extractor(language="fr", n=DEFAULT_NGRAM_SIZE, dedup_lim=DEFAULT_DEDUP_LIM, top=DEFAULT_TOP):
+    """Réserve l'extracteur d'une configuration pour le thread courant.
+
+    Les extracteurs YAKE gardent des caches internes modifiés pendant l'extraction :
+    un même extracteur n'est donc utilisé que par un thread à la fois. Chaque processus
+    possède son propre registre.
+    """
+    extractor, lock = _get_entry(language, n, dedup_lim, top)
+    with lock:
+        yield extractor
+
+
+def warm_up(languages=DEFAULT_LANGUAGES, tops=(DEFAULT_TOP,), n=DEFAULT_NGRAM_SIZE, dedup_lim=DEFAULT_DEDUP_LIM):
+    """Pré-construit les extracteurs des langues et tailles de résultats indiquées."""
+    for language in languages:
+        for top in tops:
+            _get_entry(language, n, dedup_lim, top)
+
+
+def set_max_extractors(max_extractors):
+    """Modifie la taille maximale du registre et évince les extracteurs les plus anciens."""
+    global _max_extractors
+    with _registry_lock:
+        _max_extractors = max(1, int(max_extractors))
+        while len(_extractors) > _max_extractors:
+            _extractors.popitem(last=False)
+
+
+def clear_extractors():
+    """Vide le registre des extracteurs."""
+    with _registry_lock:
+        _extractors.clear()
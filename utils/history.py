@@ -0,0 +1,149 @@
+import gzip
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrou limité au processus
+    fcntl = None
+
+DEFAULT_HISTORY_DIR = os.environ.get(
+    'YAKE_V4_HISTORY_DIR',
+    os.path.join(os.path.expanduser('~'), '.yake-v4', 'history')
+)
+DEFAULT_MAX_ENTRIES = int(os.environ.get('YAKE_V4_HISTORY_MAX_ENTRIES', 100))
+
+_INDEX_FILE = 'index.json'
+_LOCK_FILE = 'index.lock'
+
+
+def summarize_analysis(analysis_type, data):
+    """Résumé léger d'une analyse, gardé en mémoire et affiché dans la liste de l'historique."""
+    if analysis_type == 'serp_analysis':
+        results = data.get('results') or {}
+        return {
+            'title': f"{data.get('keyword')} ({data.get('location')})",
+            'user_url': data.get('user_url'),
+            'urls': len(results.get('urls', [])),
+            'top_keywords': [k['keyword'] for k in results.get('keywords', [])[:10]],
+            'topics': len(results.get('topics', []))
+        }
+    summary = {
+        'title': data.get('url') or (data.get('text') or '')[:80],
+        'keywords': len(data.get('keywords') or []),
+        'top_keywords': [k['keyword'] for k in (data.get('keywords') or [])[:10]],
+        'topics': len(data.get('topics') or []),
+        'entities': len(data.get('entities') or [])
+    }
+    return summary
+
+
+class HistoryStore:
+    """Historique des analyses : index JSON des résumés, contenus complets compressés sur disque.
+
+    Chaque entrée appartient à un `owner` (une session de l'application, par exemple) :
+    seules ses `max_entries` analyses les plus récentes sont conservées, et la liste comme
+    l'effacement se limitent à ses entrées. Plusieurs processus peuvent partager le même
+    répertoire : chaque écriture relit et fusionne l'index sous un verrou de fichier, et
+    l'index en mémoire est relu dès que le fichier a changé.
+    """
+
+    def __init__(self, directory=DEFAULT_HISTORY_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._entries = []
+        self._index_stamp = None
+
+    def _index_path(self):
+        return os.path.join(self.directory, _INDEX_FILE)
+
+    def _payload_path(self, entry_id):
+        return os.path.join(self.directory, f"{entry_id}.json.gz")
+
+    @contextmanager
+    def _locked(self):
+        """Verrou exclusif sur l'index, entre threads et entre processus."""
+        with self._lock, open(os.path.join(self.directory, _LOCK_FILE), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _read_index(self):
+        """Index courant, relu seulement si le fichier a changé (appelé sous self._lock)."""
+        try:
+            stat = os.stat(self._index_path())
+        except OSError:
+            self._entries, self._index_stamp = [], None
+            return self._entries
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._index_stamp:
+            try:
+                with open(self._index_path(), encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = []
+            self._index_stamp = stamp
+        return self._entries
+
+    def _write_index(self, entries):
+        tmp_path = self._index_path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self._index_path())
+        self._entries = entries
+        stat = os.stat(self._index_path())
+        self._index_stamp = (stat.st_mtime_ns, stat.st_size)
+
+    def _remove_payloads(self, entries):
+        for entry in entries:
+            try:
+                os.remove(self._payload_path(entry['id']))
+            except OSError:
+                pass
+
+    def add(self, analysis_type, data, owner=None):
+        """Enregistre une analyse de `owner` et renvoie son identifiant."""
+        entry_id = uuid.uuid4().hex
+        with gzip.open(self._payload_path(entry_id), 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+
+        entry = {
+            'id': entry_id,
+            'owner': owner,
+            'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'type': analysis_type,
+            'summary': summarize_analysis(analysis_type, data)
+        }
+        with self._locked():
+            entries = self._read_index() + [entry]
+            owned = [e for e in entries if e.get('owner') == owner]
+            evicted = {e['id'] for e in owned[:-self.max_entries]}
+            self._write_index([e for e in entries if e['id'] not in evicted])
+        self._remove_payloads([{'id': old_id} for old_id in evicted])
+        return entry_id
+
+    def entries(self, owner=None):
+        """Résumés des analyses de `owner`, du plus récent au plus ancien."""
+        with self._lock:
+            return [e for e in reversed(self._read_index()) if e.get('owner') == owner]
+
+    def load(self, entry_id):
+        """Charge le contenu complet d'une analyse (None s'il n'existe plus)."""
+        try:
+            with gzip.open(self._payload_path(entry_id), 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def clear(self, owner=None):
+        """Efface les analyses de `owner` (celles des autres sont conservées)."""
+        with self._locked():
+            entries = self._read_index()
+            self._write_index([e for e in entries if e.get('owner') != owner])
+        self._remove_payloads([e for e in entries if e.get('owner') == owner])
@@ -0,0 +1,133 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 32
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+USER_AGENT = "Mozilla/5.0 (compatible; SEO Content Analyzer Pro)"
+# Limites des pages téléchargées : taille du corps, durée totale, types de contenu acceptés
+PAGE_MAX_BYTES = 5 * 1024 * 1024
+PAGE_DEADLINE = 20
+PAGE_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+STREAM_CHUNK_BYTES = 64 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Session HTTP partagée (connexions keep-alive), sans retries automatiques : les API
+    sont régulées par `utils.rate_limit` et `fetch_limited` réessaie dans son délai."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+            _session = requests.Session()
+            _session.headers['User-Agent'] = USER_AGENT
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+def api_get(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """GET sans retries automatiques : une réponse 429 / 5xx est renvoyée telle quelle."""
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+
+class FetchRejected(requests.RequestException):
+    """Téléchargement interrompu par une limite ; `reason` vaut 'too_large',
+    'content_type' ou 'deadline'."""
+
+    def __init__(self, url, reason, detail=''):
+        super().__init__(f"{url}: {reason} {detail}".strip())
+        self.url = url
+        self.reason = reason
+
+
+def _retry_pause(response, attempt):
+    """Pause avant un nouvel essai : Retry-After du serveur, sinon backoff exponentiel."""
+    value = response.headers.get('Retry-After', '') if response is not None else ''
+    return float(value) if value.isdigit() else RETRY_BACKOFF * 2 ** attempt
+
+
+def fetch_limited(url, headers=None, max_bytes=PAGE_MAX_BYTES, deadline=PAGE_DEADLINE,
+                  content_types=PAGE_CONTENT_TYPES):
+    """GET dont le corps est lu en flux, avec une taille et une durée totale maximales.
+
+    Les erreurs réseau et les statuts de RETRY_STATUSES sont réessayés (au plus
+    RETRY_TOTAL fois) tant que la pause et un nouvel essai tiennent dans `deadline`,
+    décompté depuis la première tentative ; sinon l'erreur ou la réponse est renvoyée
+    telle quelle. Le téléchargement est abandonné (FetchRejected) dès que le type de
+    contenu n'est pas dans `content_types`, que le corps dépasse `max_bytes` (annoncé ou
+    reçu) ou que `deadline` secondes se sont écoulées, lecture du corps comprise. Renvoie
+    (réponse, corps) ; la réponse est fermée et son contenu n'est pas chargé.
+    """
+    started = time.monotonic()
+    session = get_session()
+    for attempt in range(RETRY_TOTAL + 1):
+        remaining = deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            raise FetchRejected(url, 'deadline', f"plus de {deadline:.1f} s")
+        timeout = (min(CONNECT_TIMEOUT, remaining), min(READ_TIMEOUT, remaining))
+        try:
+            response = session.get(url, headers=headers, timeout=timeout, stream=True)
+        except (requests.ConnectionError, requests.Timeout):
+            pause = _retry_pause(None, attempt)
+            if attempt == RETRY_TOTAL or time.monotonic() - started + pause >= deadline:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == RETRY_TOTAL:
+                break
+            pause = _retry_pause(response, attempt)
+            if time.monotonic() - started + pause >= deadline:
+                break
+            response.close()
+        time.sleep(pause)
+
+    # L'échéance est tenue par un minuteur qui interrompt la lecture en cours, même si le
+    # serveur envoie son corps octet par octet
+    expired = threading.Event()
+
+    def expire():
+        expired.set()
+        response.raw.shutdown()
+
+    timer = threading.Timer(max(0, deadline - (time.monotonic() - started)), expire)
+    timer.daemon = True
+    try:
+        if response.ok and content_types:
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if content_type and content_type not in content_types:
+                raise FetchRejected(url, 'content_type', content_type)
+        declared = response.headers.get('Content-Length', '')
+        if declared.isdigit() and int(declared) > max_bytes:
+            raise FetchRejected(url, 'too_large', f"{declared} octets annoncés")
+
+        timer.start()
+        chunks = []
+        size = 0
+        try:
+            for chunk in response.iter_content(STREAM_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise FetchRejected(url, 'too_large', f"plus de {max_bytes} octets")
+                chunks.append(chunk)
+        except FetchRejected:
+            raise
+        except requests.RequestException:
+            if not expired.is_set():
+                raise
+        # Sans Content-Length, une lecture interrompue ressemble à une fin de corps
+        if expired.is_set():
+            raise FetchRejected(url, 'deadline', f"plus de {deadline:.1f} s")
+    finally:
+        timer.cancel()
+        response.close()
+    return response, b''.join(chunks)
@@ -0,0 +1,238 @@
+"""Suivi régulier des SERP : seules les pages nouvelles ou modifiées sont réanalysées.
+
+Usage :
+    python -m utils.monitoring mots_cles.csv -o suivi.jsonl --language fr
+
+Pour chaque (mot-clé, localisation), un instantané est conservé : URLs de la SERP,
+empreinte du texte de chaque page et son analyse (sans le texte). À chaque exécution, les
+pages sont revalidées par requêtes conditionnelles (ETag / Last-Modified) ; YAKE et
+TextRazor ne tournent que sur les pages nouvelles ou dont le texte a changé, les agrégats
+de l'instantané précédent sont corrigés page par page, et un diff est produit :
+mouvements dans le classement, mots-clés et topics gagnés ou perdus.
+"""
+import argparse
+import concurrent.futures
+import gzip
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+from datetime import datetime
+from .batch import read_jobs
+from .page_cache import fetch_page
+from .serp_aggregation import SerpAggregator
+from .serp_analysis import (
+    DEFAULT_MAX_PER_HOST,
+    DEFAULT_MAX_WORKERS,
+    HostLimiter,
+    analyze_page_text,
+    get_serp_results
+)
+from .tracing import annotate, span, start_trace, submit_in_context
+
+DEFAULT_MONITORING_DIR = os.environ.get(
+    'YAKE_V4_MONITORING_DIR',
+    os.path.join(os.path.expanduser('~'), '.yake-v4', 'monitoring')
+)
+# Une SERP de moins d'une heure n'est pas redemandée à ValueSERP
+MONITORING_SERP_TTL = 3600
+SERP_DEPTH = 10
+# Seuls les mots-clés présents dans au moins ce nombre de pages entrent dans le diff
+DIFF_MIN_URLS = 2
+
+
+def text_fingerprint(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class SnapshotStore:
+    """Instantanés de suivi, un fichier JSON compressé par (mot-clé, localisation)."""
+
+    def __init__(self, directory=DEFAULT_MONITORING_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, keyword, location):
+        digest = hashlib.sha256(json.dumps([keyword, location], ensure_ascii=False).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{digest[:24]}.json.gz")
+
+    def load(self, keyword, location):
+        try:
+            with gzip.open(self._path(keyword, location), 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, snapshot):
+        path = self._path(snapshot['keyword'], snapshot['location'])
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+def _check_page(url, previous, textrazor_api_key, language, host_limiter, yake_backend):
+    """Revalide une page et ne la réanalyse que si son texte a changé.
+
+    Renvoie (statut, empreinte, analyse sans le texte) ; statut parmi 'new', 'changed',
+    'unchanged', 'unreachable' (analyse précédente conservée) et 'error'.
+    """
+    with span('url', url=url):
+        try:
+            with host_limiter.slot(url), span('fetch', url=url):
+                page = fetch_page(url, revalidate=True)
+        except Exception as e:
+            annotate(error=type(e).__name__)
+            if previous:
+                return 'unreachable', previous['fingerprint'], previous['analysis']
+            return 'error', None, None
+
+        text = page['text'] if page else None
+        if not text:
+            return 'error', None, None
+        fingerprint = text_fingerprint(text)
+        if previous and previous['fingerprint'] == fingerprint:
+            annotate(status='unchanged')
+            return 'unchanged', fingerprint, previous['analysis']
+
+        analysis = analyze_page_text(url, text, textrazor_api_key, language, yake_backend)
+        if analysis is None:
+            return 'error', None, None
+        status = 'changed' if previous else 'new'
+        annotate(status=status)
+        return status, fingerprint, {k: v for k, v in analysis.items() if k != 'text'}
+
+
+def diff_snapshots(previous, current):
+    """Différences entre deux instantanés : classement, mots-clés et topics."""
+    previous_positions = {url: position for position, url in enumerate(previous['urls'], 1)}
+    current_positions = {url: position for position, url in enumerate(current['urls'], 1)}
+
+    def significant_keywords(snapshot):
+        return {k['keyword'] for k in snapshot['keywords'] if k['urls_count'] >= DIFF_MIN_URLS}
+
+    previous_keywords = significant_keywords(previous)
+    current_keywords = significant_keywords(current)
+    previous_topics = {t['topic'] for t in previous['topics']}
+    current_topics = {t['topic'] for t in current['topics']}
+
+    return {
+        'since': previous['date'],
+        'new_urls': [
+            {'url': url, 'position': position}
+            for url, position in current_positions.items() if url not in previous_positions
+        ],
+        'lost_urls': [
+            {'url': url, 'previous_position': position}
+            for url, position in previous_positions.items() if url not in current_positions
+        ],
+        'moved_urls': [
+            {'url': url, 'position': position, 'previous_position': previous_positions[url],
+             'change': previous_positions[url] - position}
+            for url, position in current_positions.items()
+            if url in previous_positions and previous_positions[url] != position
+        ],
+        'changed_pages': [url for url, page in current['pages'].items() if page['status'] == 'changed'],
+        'new_keywords': sorted(current_keywords - previous_keywords),
+        'lost_keywords': sorted(previous_keywords - current_keywords),
+        'new_topics': sorted(current_topics - previous_topics),
+        'lost_topics': sorted(previous_topics - current_topics)
+    }
+
+
+def monitor_serp(keyword, location, valueserp_api_key, textrazor_api_key, language="fr", store=None,
+                 max_workers=DEFAULT_MAX_WORKERS, max_per_host=DEFAULT_MAX_PER_HOST, yake_backend=None):
+    """Met à jour l'instantané de suivi d'un mot-clé et renvoie le rapport de l'exécution.
+
+    Le rapport reprend les agrégats (keywords, topics, entities), le statut de chaque
+    page, le nombre de pages par statut et le diff avec l'exécution précédente (None à la
+    première exécution). Renvoie None si la SERP n'a pas pu être récupérée.
+    """
+    store = store or SnapshotStore()
+    with start_trace(f"monitor:{keyword}") as trace:
+        previous = store.load(keyword, location)
+        urls = get_serp_results(keyword, location, valueserp_api_key, ttl=MONITORING_SERP_TTL)
+        if not urls:
+            return None
+        urls = list(dict.fromkeys(urls[:SERP_DEPTH]))
+        previous_pages = previous['pages'] if previous else {}
+
+        host_limiter = HostLimiter(max_per_host)
+        checks = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(urls)))) as executor:
+            futures = {
+                submit_in_context(executor, _check_page, url, previous_pages.get(url), textrazor_api_key, language,
+                                  host_limiter, yake_backend): url
+                for url in urls
+            }
+            for future in concurrent.futures.as_completed(futures):
+                checks[futures[future]] = future.result()
+
+        # Agrégats de l'exécution précédente, corrigés uniquement pour les pages concernées
+        aggregator = SerpAggregator()
+        for url, page in previous_pages.items():
+            aggregator.add(page['analysis'], key=url)
+        with span('aggregation', urls=len(urls)):
+            for url in previous_pages:
+                if url not in checks:
+                    aggregator.remove(url)
+            for url, (status, _, analysis) in checks.items():
+                if status in ('new', 'changed'):
+                    aggregator.add(analysis, key=url)
+                elif status == 'error':
+                    aggregator.remove(url)
+
+        snapshot = {
+            'keyword': keyword,
+            'location': location,
+            'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'urls': urls,
+            'pages': {
+                url: {'status': status, 'fingerprint': fingerprint, 'analysis': analysis}
+                for url, (status, fingerprint, analysis) in checks.items() if analysis is not None
+            },
+            **aggregator.snapshot()
+        }
+        store.save(snapshot)
+
+        report = {k: v for k, v in snapshot.items() if k != 'pages'}
+        report['page_status'] = {url: checks[url][0] for url in urls}
+        report['stats'] = dict(Counter(status for status, _, _ in checks.values()))
+        report['diff'] = diff_snapshots(previous, snapshot) if previous else None
+        report['trace'] = trace.records()
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suivi incrémental des SERP (CSV/JSONL -> JSONL).")
+    parser.add_argument('input', help="Fichier CSV ou JSONL (keyword, location)")
+    parser.add_argument('-o', '--output', required=True, help="Fichier JSONL où ajouter les rapports")
+    parser.add_argument('--monitoring-dir', default=DEFAULT_MONITORING_DIR,
+                        help="Répertoire des instantanés de suivi")
+    parser.add_argument('--language', default='fr')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument('--max-per-host', type=int, default=DEFAULT_MAX_PER_HOST)
+    parser.add_argument('--valueserp-api-key', default=os.environ.get('VALUESERP_API_KEY'))
+    parser.add_argument('--textrazor-api-key', default=os.environ.get('TEXTRAZOR_API_KEY'))
+    args = parser.parse_args(argv)
+
+    if not args.valueserp_api_key:
+        parser.error("clé ValueSERP manquante (--valueserp-api-key ou VALUESERP_API_KEY)")
+
+    store = SnapshotStore(args.monitoring_dir)
+    with open(args.output, 'a', encoding='utf-8') as output:
+        for job in read_jobs(args.input):
+            report = monitor_serp(job['keyword'], job['location'], args.valueserp_api_key, args.textrazor_api_key,
+                                  args.language, store, args.concurrency, args.max_per_host)
+            if report is None:
+                print(f"[erreur] {job['keyword']} ({job['location']})", file=sys.stderr)
+                continue
+            report.pop('trace', None)
+            output.write(json.dumps(report, ensure_ascii=False, default=str) + '\n')
+            output.flush()
+            print(f"[ok] {job['keyword']} ({job['location']}) {report['stats']}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
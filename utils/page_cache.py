@@ -0,0 +1,119 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import requests
+from requests.compat import chardet
+from .cache import get_cache
+from .http_client import PAGE_DEADLINE, fetch_limited
+from .startup import lazy_import
+from .tracing import annotate, span
+
+PAGE_TTL = 24 * 3600
+PAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+_DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def normalize_url(url):
+    """Normalise une URL pour servir de clé de cache (schéma/hôte en minuscules, sans fragment)."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and str(parts.port) != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def get_page_cache():
+    """Cache disque partagé des pages téléchargées."""
+    return get_cache('pages', ttl=PAGE_TTL, max_bytes=PAGE_CACHE_MAX_BYTES)
+
+
+def page_cache_stats():
+    return get_page_cache().stats()
+
+
+def _decode_html(response, body):
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        try:
+            return body.decode(response.encoding, errors='replace')
+        except LookupError:
+            pass
+    try:
+        return body.decode('utf-8')
+    except UnicodeDecodeError:
+        return body.decode(chardet.detect(body)['encoding'] or 'utf-8', errors='replace')
+
+
+def _download(url, cached=None, deadline=PAGE_DEADLINE):
+    """Télécharge une page ; renvoie None si la version en cache est toujours valide (304).
+
+    Le corps est lu en flux avec les limites de `fetch_limited` (taille, type de contenu,
+    `deadline` en secondes).
+    """
+    headers = {}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+    with span('download', url=url, conditional=bool(headers)):
+        response, body = fetch_limited(url, headers=headers, deadline=deadline)
+        annotate(status=response.status_code, bytes=len(body))
+        if response.status_code == 304 and cached:
+            return None
+        response.raise_for_status()
+
+    html = _decode_html(response, body)
+    with span('extract', html_length=len(html)) as current:
+        text = lazy_import('trafilatura').extract(html)
+        current.set(text_length=len(text or ''))
+    return {
+        'url': response.url,
+        'html': html,
+        'text': text,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified')
+    }
+
+
+def fetch_page(url, use_cache=True, revalidate=False, deadline=PAGE_DEADLINE):
+    """Renvoie la page (HTML brut et texte extrait) en passant par le cache disque.
+
+    Une entrée fraîche est servie sans accès réseau ni analyse HTML. Une entrée expirée
+    (ou toute entrée avec `revalidate`) est revalidée avec ETag / Last-Modified lorsque
+    le serveur les a fournis. Le téléchargement éventuel dure au plus `deadline` secondes.
+    """
+    if not use_cache:
+        return _download(url, deadline=deadline)
+
+    cache = get_page_cache()
+    key = normalize_url(url)
+    entry = cache.get_entry(key)
+
+    if entry is not None and not revalidate and cache.is_fresh(entry):
+        cache.record('hits')
+        annotate(cache='hit')
+        return entry.value
+
+    if entry is None:
+        cache.record('misses')
+        annotate(cache='miss')
+        page = _download(url, deadline=deadline)
+    else:
+        cache.record('stale')
+        annotate(cache='stale')
+        try:
+            page = _download(url, entry.value, deadline)
+        except requests.RequestException:
+            # Le serveur ne répond pas : la version expirée reste préférable à rien
+            return entry.value
+        if page is None:
+            cache.record('revalidated')
+            annotate(cache='revalidated')
+            cache.touch(key)
+            return entry.value
+
+    cache.set(key, page)
+    return page
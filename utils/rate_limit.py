@@ -0,0 +1,315 @@
+import concurrent.futures
+import contextvars
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import urllib.error
+from contextlib import contextmanager
+from datetime import date
+import requests
+from .cache import DEFAULT_CACHE_DIR
+from .tracing import annotate
+
+logger = logging.getLogger(__name__)
+
+# Limites par défaut des API (surchargeables par YAKE_V4_<API>_RATE, _BURST, _CONCURRENCY, _DAILY_QUOTA,
+# _TIMEOUT) ; `timeout` borne la durée d'un appel, en secondes
+PROVIDER_LIMITS = {
+    # Offre gratuite TextRazor : 2 requêtes simultanées, 500 par jour
+    'textrazor': {'rate': 2.0, 'burst': 2, 'max_in_flight': 2, 'daily_quota': None, 'timeout': 60},
+    'valueserp': {'rate': 5.0, 'burst': 5, 'max_in_flight': 5, 'daily_quota': None, 'timeout': 60}
+}
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# Statuts signalant une surcharge : la concurrence est réduite et la requête réessayée
+THROTTLE_STATUSES = (429, 500, 502, 503, 504)
+QUOTA_DB_TIMEOUT = 10
+
+_HTTP_CODE_RE = re.compile(r"HTTP Code (\d{3})")
+
+
+class QuotaExceeded(Exception):
+    """Quota journalier d'une API atteint : aucune requête n'est envoyée."""
+
+
+class DeadlineExceeded(Exception):
+    """Échéance de l'appelant atteinte avant qu'une requête puisse être envoyée ou réessayée."""
+
+
+def error_status(error):
+    """Statut HTTP porté par une exception requests ou TextRazor (None s'il n'y en a pas)."""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        return response.status_code
+    match = _HTTP_CODE_RE.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+def _retry_after(error):
+    response = getattr(error, 'response', None)
+    value = response.headers.get('Retry-After', '') if response is not None else ''
+    return float(value) if value.isdigit() else None
+
+
+def is_retryable(error):
+    """Surcharge (429, 5xx) ou erreur réseau transitoire."""
+    status = error_status(error)
+    if status is not None:
+        return status in THROTTLE_STATUSES
+    return isinstance(error, (requests.ConnectionError, requests.Timeout, urllib.error.URLError,
+                              ConnectionError, TimeoutError))
+
+
+class QuotaCounter:
+    """Compteurs journaliers de requêtes par API, partagés entre processus via SQLite.
+
+    `increment` vérifie le quota et incrémente le compteur dans une même transaction
+    (BEGIN IMMEDIATE) : deux processus ne peuvent pas dépasser le quota ensemble. Les
+    compteurs des jours précédents sont supprimés au passage.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=QUOTA_DB_TIMEOUT, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS daily_requests ('
+            'api TEXT NOT NULL, day TEXT NOT NULL, n INTEGER NOT NULL, PRIMARY KEY (api, day))'
+        )
+
+    def increment(self, api, daily_quota=None):
+        """Compte une requête ; renvoie (acceptée, nombre de requêtes du jour)."""
+        today = date.today().isoformat()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute('DELETE FROM daily_requests WHERE day < ?', (today,))
+                self._conn.execute('INSERT OR IGNORE INTO daily_requests (api, day, n) VALUES (?, ?, 0)',
+                                   (api, today))
+                accepted = self._conn.execute(
+                    'UPDATE daily_requests SET n = n + 1 WHERE api = ? AND day = ? AND (? IS NULL OR n < ?)',
+                    (api, today, daily_quota, daily_quota)
+                ).rowcount == 1
+                used = self._conn.execute('SELECT n FROM daily_requests WHERE api = ? AND day = ?',
+                                          (api, today)).fetchone()[0]
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        return accepted, used
+
+
+_quota_counter = None
+_quota_counter_lock = threading.Lock()
+
+
+def get_quota_counter():
+    """Compteur de quotas partagé (fichier quotas.sqlite du répertoire des caches)."""
+    global _quota_counter
+    with _quota_counter_lock:
+        if _quota_counter is None:
+            _quota_counter = QuotaCounter(os.path.join(DEFAULT_CACHE_DIR, 'quotas.sqlite'))
+        return _quota_counter
+
+
+def _call_with_timeout(fn, args, kwargs, timeout):
+    """Exécute `fn` dans un thread dédié et lève TimeoutError après `timeout` secondes.
+
+    Un appel qui ne répond pas (client HTTP sans délai, comme celui de TextRazor) rend la
+    main à l'appelant ; son thread se termine quand l'appel aboutit enfin.
+    """
+    future = concurrent.futures.Future()
+    context = contextvars.copy_context()
+
+    def run():
+        try:
+            future.set_result(context.run(fn, *args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name='api-call', daemon=True).start()
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        raise TimeoutError(f"Pas de réponse après {timeout:.1f} s") from None
+
+
+class RateLimiter:
+    """Limiteur côté client d'une API : seau à jetons et requêtes simultanées adaptatives.
+
+    Au plus `rate` requêtes par seconde (par rafales de `burst`) et au plus `limit`
+    requêtes en cours. `limit` suit un contrôle AIMD : +1/limit par succès jusqu'à
+    `max_in_flight`, divisé par deux (au moins 1) à chaque 429 / 5xx, réponses après
+    lesquelles tous les appelants marquent une pause (Retry-After ou backoff). `call`
+    réessaie les erreurs transitoires avec un backoff exponentiel à jitter complet ; un
+    appel sans réponse après `timeout` secondes libère sa place et compte comme une erreur
+    réseau transitoire.
+    Les requêtes du jour sont comptées dans un compteur SQLite partagé entre processus
+    (voir `QuotaCounter`) et refusées (QuotaExceeded) au-delà de `daily_quota`.
+    """
+
+    def __init__(self, name, rate, burst, max_in_flight, daily_quota=None, max_retries=MAX_RETRIES,
+                 timeout=None):
+        self.name = name
+        self.timeout = timeout
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.daily_quota = daily_quota
+        self.max_retries = max_retries
+        self.limit = float(max_in_flight)
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._stats = {'requests': 0, 'throttled': 0, 'retries': 0, 'failures': 0}
+        self._quota_used = 0
+
+    def _take_token(self, now):
+        """Consomme un jeton si possible ; sinon renvoie le délai avant le prochain."""
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _count_request(self):
+        # Transaction SQLite hors de _cond : les autres appelants ne l'attendent pas
+        accepted, used = get_quota_counter().increment(self.name, self.daily_quota)
+        with self._cond:
+            self._quota_used = used
+            if accepted:
+                self._stats['requests'] += 1
+        if not accepted:
+            raise QuotaExceeded(f"Quota journalier {self.name} atteint ({self.daily_quota} requêtes)")
+
+    @contextmanager
+    def slot(self, expires_at=None):
+        """Attend un jeton et une place parmi les requêtes en cours (au plus jusqu'à
+        `expires_at`, en time.monotonic, sinon DeadlineExceeded)."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if expires_at is not None and now >= expires_at:
+                    raise DeadlineExceeded(f"{self.name} : échéance atteinte avant l'envoi de la requête")
+                # Aucune attente ne dépasse l'échéance
+                available = float('inf') if expires_at is None else expires_at - now
+                if now < self._paused_until:
+                    self._cond.wait(min(self._paused_until - now, available))
+                    continue
+                if self._in_flight >= int(self.limit):
+                    self._cond.wait(None if expires_at is None else available)
+                    continue
+                delay = self._take_token(now)
+                if not delay:
+                    break
+                self._cond.wait(min(delay, available))
+            self._in_flight += 1
+        try:
+            self._count_request()
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def succeeded(self):
+        with self._cond:
+            self.limit = min(self.max_in_flight, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def throttled(self, pause):
+        """Surcharge signalée par l'API : concurrence divisée par deux et pause commune."""
+        with self._cond:
+            self._stats['throttled'] += 1
+            self.limit = max(1.0, self.limit / 2)
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+    def call(self, fn, *args, expires_at=None, **kwargs):
+        """Appelle `fn` sous le limiteur, en réessayant les erreurs transitoires.
+
+        Avec `expires_at` (time.monotonic), l'attente d'une place, l'appel lui-même et les
+        nouveaux essais s'arrêtent à l'échéance : l'attente lève DeadlineExceeded, et une
+        erreur dont la pause dépasserait l'échéance est relevée telle quelle.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.slot(expires_at):
+                    timeout = self.timeout
+                    if expires_at is not None:
+                        timeout = min(timeout or float('inf'), max(0, expires_at - time.monotonic()))
+                    if timeout is None:
+                        result = fn(*args, **kwargs)
+                    else:
+                        result = _call_with_timeout(fn, args, kwargs, timeout)
+            except (QuotaExceeded, DeadlineExceeded):
+                raise
+            except Exception as e:
+                pause = _retry_after(e) or random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+                out_of_time = expires_at is not None and time.monotonic() + pause >= expires_at
+                if not is_retryable(e) or attempt == self.max_retries or out_of_time:
+                    with self._cond:
+                        self._stats['failures'] += 1
+                    raise
+                logger.info("%s : %s, nouvel essai dans %.1f s", self.name, e, pause)
+                if error_status(e) is not None:
+                    self.throttled(pause)
+                else:
+                    time.sleep(pause)
+                with self._cond:
+                    self._stats['retries'] += 1
+                annotate(retries=attempt + 1)
+                continue
+            self.succeeded()
+            return result
+
+    def stats(self):
+        with self._cond:
+            return {
+                **self._stats,
+                'in_flight': self._in_flight,
+                'limit': self.limit,
+                'quota_used': self._quota_used,
+                'daily_quota': self.daily_quota
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _env_number(variable, default):
+    value = os.environ.get(variable)
+    return float(value) if value else default
+
+
+def get_limiter(name):
+    """Renvoie le limiteur partagé de l'API `name` (voir PROVIDER_LIMITS)."""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limits = PROVIDER_LIMITS[name]
+            prefix = f"YAKE_V4_{name.upper()}"
+            daily_quota = _env_number(f"{prefix}_DAILY_QUOTA", limits['daily_quota'])
+            timeout = _env_number(f"{prefix}_TIMEOUT", limits['timeout'])
+            limiter = RateLimiter(
+                name,
+                rate=_env_number(f"{prefix}_RATE", limits['rate']),
+                burst=_env_number(f"{prefix}_BURST", limits['burst']),
+                max_in_flight=int(_env_number(f"{prefix}_CONCURRENCY", limits['max_in_flight'])),
+                daily_quota=int(daily_quota) if daily_quota is not None else None,
+                timeout=timeout
+            )
+            _limiters[name] = limiter
+        return limiter
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+KEYWORD_COLUMNS = ['keyword', 'avg_score', 'total_occurrences', 'min_occurrences', 'max_occurrences',
+                   'std_occurrences', 'urls_count']
+TOPIC_COLUMNS = ['topic', 'count', 'avg_score']
+ENTITY_COLUMNS = ['entity', 'total_count', 'avg_relevance']
+
+
+class SerpAggregator:
+    """Agrégats des mots-clés, topics et entités des pages SERP, alimentés page par page.
+
+    Les lignes de chaque page sont ajoutées à trois tables en colonnes : (url_idx, keyword,
+    score, occurrences), (url_idx, topic) et (url_idx, entity, count, relevance) ; un ajout
+    ne fait que prolonger ces colonnes. Les agrégats ne sont calculés qu'à la demande, avec
+    NumPy à partir des codes des clés (bincount, reduceat), en temps quasi linéaire dans le
+    nombre de lignes, et conservés jusqu'à la modification suivante : en flux, un agrégat
+    partiel demandé après chaque page relit toutes les lignes reçues, quelques milliers au
+    plus pour une SERP. Une page ajoutée avec une clé (son URL, par exemple) peut être
+    retirée ou remplacée sans reconstruire les tables.
+    """
+
+    def __init__(self):
+        self._next_idx = 0
+        # clé de page -> url_idx de ses lignes actives
+        self._active = {}
+        self._keywords = {'url_idx': [], 'keyword': [], 'score': [], 'occurrences': []}
+        self._topics = {'url_idx': [], 'topic': []}
+        self._entities = {'url_idx': [], 'entity': [], 'count': [], 'relevance': []}
+        self._frames = {}
+
+    @property
+    def pages(self):
+        return len(self._active)
+
+    def add(self, analysis, key=None):
+        """Ajoute les lignes d'une page (dict renvoyé par `analyze_url_content`).
+
+        Une page déjà présente sous la même `key` est remplacée.
+        """
+        url_idx = self._next_idx
+        self._next_idx += 1
+        self._active[url_idx if key is None else key] = url_idx
+        self._frames = {}
+
+        keywords = analysis['keywords']
+        self._keywords['url_idx'].extend([url_idx] * len(keywords))
+        self._keywords['keyword'].extend(kw['keyword'] for kw in keywords)
+        self._keywords['score'].extend(kw['score'] for kw in keywords)
+        self._keywords['occurrences'].extend(kw['occurrences'] for kw in keywords)
+
+        topics = analysis['topics']
+        self._topics['url_idx'].extend([url_idx] * len(topics))
+        self._topics['topic'].extend(topics)
+
+        entities = analysis['entities']
+        self._entities['url_idx'].extend([url_idx] * len(entities))
+        self._entities['entity'].extend(entity['entity'] for entity in entities)
+        self._entities['count'].extend(entity['count'] for entity in entities)
+        self._entities['relevance'].extend(entity['relevance'] for entity in entities)
+
+    def remove(self, key):
+        """Retire une page ajoutée avec `key` ; ses lignes sont ignorées par les agrégats."""
+        if self._active.pop(key, None) is not None:
+            self._frames = {}
+
+    def __contains__(self, key):
+        return key in self._active
+
+    def _columns(self, table):
+        """Colonnes des lignes des pages actives (filtrées seulement si des pages ont été retirées)."""
+        url_idx = np.asarray(table['url_idx'], dtype=np.int64)
+        if len(self._active) == self._next_idx:
+            return {**table, 'url_idx': url_idx}
+        mask = np.isin(url_idx, np.fromiter(self._active.values(), dtype=np.int64, count=len(self._active)))
+        columns = {
+            name: np.asarray(values, dtype=object)[mask] for name, values in table.items() if name != 'url_idx'
+        }
+        columns['url_idx'] = url_idx[mask]
+        return columns
+
+    def _frame(self, name, build):
+        if name not in self._frames:
+            self._frames[name] = build()
+        return self._frames[name]
+
+    def _document_frequency(self, codes, url_idx, size):
+        # Nombre d'URLs distinctes par clé : couples (clé, URL) uniques comptés par clé
+        pairs = np.unique(codes * self._next_idx + url_idx)
+        return np.bincount(pairs // self._next_idx, minlength=size)
+
+    def keywords_frame(self):
+        def build():
+            columns = self._columns(self._keywords)
+            if not len(columns['keyword']):
+                return pd.DataFrame(columns=KEYWORD_COLUMNS)
+            codes, keywords = pd.factorize(pd.Series(columns['keyword'], dtype=object), sort=True)
+            size = len(keywords)
+            occurrences = np.asarray(columns['occurrences'], dtype=np.int64)
+            scores = np.asarray(columns['score'], dtype=float)
+
+            rows = np.bincount(codes, minlength=size)
+            total = np.bincount(codes, weights=occurrences, minlength=size)
+            squares = np.bincount(codes, weights=occurrences.astype(float) ** 2, minlength=size)
+            # min / max par clé sur les occurrences triées par clé
+            order = np.argsort(codes, kind='stable')
+            starts = np.concatenate(([0], np.cumsum(rows)[:-1]))
+            sorted_occurrences = occurrences[order]
+            # Écart-type d'échantillon, comme pandas (indéfini pour une seule ligne)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                variance = np.where(rows > 1, np.maximum(squares - total ** 2 / rows, 0) / (rows - 1), np.nan)
+
+            return pd.DataFrame({
+                'keyword': keywords,
+                'avg_score': np.bincount(codes, weights=scores, minlength=size) / rows,
+                'total_occurrences': total.astype(np.int64),
+                'min_occurrences': np.minimum.reduceat(sorted_occurrences, starts),
+                'max_occurrences': np.maximum.reduceat(sorted_occurrences, starts),
+                'std_occurrences': np.sqrt(variance),
+                'urls_count': self._document_frequency(codes, columns['url_idx'], size)
+            })
+        return self._frame('keywords', build)
+
+    def topics_frame(self):
+        def build():
+            columns = self._columns(self._topics)
+            if not len(columns['topic']):
+                return pd.DataFrame(columns=TOPIC_COLUMNS)
+            codes, topics = pd.factorize(pd.Series(columns['topic'], dtype=object), sort=True)
+            count = self._document_frequency(codes, columns['url_idx'], len(topics))
+            return pd.DataFrame({'topic': topics, 'count': count, 'avg_score': count / self.pages})
+        return self._frame('topics', build)
+
+    def entities_frame(self):
+        def build():
+            columns = self._columns(self._entities)
+            if not len(columns['entity']):
+                return pd.DataFrame(columns=ENTITY_COLUMNS)
+            codes, entities = pd.factorize(pd.Series(columns['entity'], dtype=object), sort=True)
+            size = len(entities)
+            rows = np.bincount(codes, minlength=size)
+            return pd.DataFrame({
+                'entity': entities,
+                'total_count': np.bincount(codes, weights=np.asarray(columns['count'], dtype=float),
+                                           minlength=size).astype(np.int64),
+                'avg_relevance': np.bincount(codes, weights=np.asarray(columns['relevance'], dtype=float),
+                                             minlength=size) / rows
+            })
+        return self._frame('entities', build)
+
+    def _records(self, df):
+        # Équivalent de to_dict('records') avec des scalaires Python, sans passer ligne à ligne par pandas
+        columns = list(df.columns)
+        return [dict(zip(columns, row)) for row in zip(*(df[column].tolist() for column in columns))]
+
+    def keywords(self):
+        return self._records(self.keywords_frame())
+
+    def topics(self):
+        return self._records(self.topics_frame())
+
+    def entities(self):
+        return self._records(self.entities_frame())
+
+    def snapshot(self):
+        return {
+            'keywords': self.keywords(),
+            'topics': self.topics(),
+            'entities': self.entities()
+        }
@@ -1,232 +1,476 @@
-import requests
-import pandas as pd
+import hashlib
+import json
+import os
 from collections import Counter
 import concurrent.futures
+import logging
+import threading
 import time
-import yake
-from textrazor import TextRazor
-import trafilatura
+from contextlib import contextmanager
+from urllib.parse import urlparse
 from .text_analysis import extract_keywords, analyze_text_with_textrazor
+from .cache import get_cache
+from .dedup import WAIT_TIMEOUT, NearDuplicateIndex
+from .http_client import CONNECT_TIMEOUT, DEFAULT_TIMEOUT, PAGE_DEADLINE, READ_TIMEOUT, FetchRejected, api_get
+from .page_cache import fetch_page
+from .rate_limit import error_status, get_limiter
+from .serp_aggregation import SerpAggregator
+from .serp_profile import SerpProfile
+from .similarity import SerpSimilarity
+from .tracing import annotate, span, start_trace, submit_in_context
 
-def get_serp_results(keyword, location, api_key):
-    """Récupère les résultats SERP via ValueSERP API."""
+logger = logging.getLogger(__name__)
+
+VALUESERP_ENDPOINT = os.environ.get('VALUESERP_ENDPOINT', 'https://api.valueserp.com/search')
+SERP_CACHE_TTL = 6 * 3600
+
+# Concurrence par défaut pour l'analyse des URLs des SERP
+DEFAULT_MAX_WORKERS = 10
+DEFAULT_MAX_PER_HOST = 2
+
+
+class HostLimiter:
+    """Limite le nombre de téléchargements simultanés vers un même hôte."""
+
+    def __init__(self, max_per_host=DEFAULT_MAX_PER_HOST):
+        self.max_per_host = max(1, int(max_per_host))
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._semaphores[host]
+
+    @contextmanager
+    def slot(self, url):
+        semaphore = self._semaphore(url)
+        with semaphore:
+            yield
+
+def get_serp_cache():
+    """Cache disque partagé des résultats ValueSERP."""
+    return get_cache('serp', ttl=SERP_CACHE_TTL)
+
+def serp_cache_key(keyword, location, google_domain, gl, hl, num):
+    """Clé de cache d'une requête SERP (sans la clé API)."""
+    payload = json.dumps([keyword, location, google_domain, gl, hl, num], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _valueserp_request(params, expires_at=None):
+    timeout = DEFAULT_TIMEOUT
+    if expires_at is not None:
+        remaining = max(expires_at - time.monotonic(), 0.001)
+        timeout = (min(CONNECT_TIMEOUT, remaining), min(READ_TIMEOUT, remaining))
+    response = api_get(VALUESERP_ENDPOINT, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response
+
+def get_serp_results(keyword, location, api_key, google_domain='google.fr', gl='fr', hl='fr', num=30,
+                     use_cache=True, ttl=SERP_CACHE_TTL, deadline=None):
+    """Récupère les résultats SERP via ValueSERP API.
+
+    Les résultats sont mis en cache `ttl` secondes par requête (mot-clé, localisation,
+    domaine, gl, hl, num). Les appels passent par le limiteur partagé 'valueserp' (voir
+    `utils.rate_limit`), qui réessaie les réponses 429 / 5xx. Avec `deadline` (secondes),
+    l'attente du limiteur, les délais de lecture et les nouveaux essais sont bornés par
+    cette durée.
+    """
     if not api_key:
         raise ValueError("Clé API ValueSERP manquante")
+    expires_at = time.monotonic() + deadline if deadline is not None else None
         
     params = {
         'api_key': api_key,
         'q': keyword,
         'location': location,
-        'google_domain': 'google.fr',
-        'gl': 'fr',
-        'hl': 'fr',
-        'num': 30
+        'google_domain': google_domain,
+        'gl': gl,
+        'hl': hl,
+        'num': num
     }
-    
-    try:
-        response = requests.get('https://api.valueserp.com/search', params=params)
-        response.raise_for_status()
-        data = response.json()
+
+    with span('valueserp', keyword=keyword):
+        cache = get_serp_cache() if use_cache else None
+        cache_key = serp_cache_key(keyword, location, google_domain, gl, hl, num)
+        if cache is not None:
+            cached = cache.get(cache_key, ttl=ttl)
+            if cached is not None:
+                annotate(cache='hit', results=len(cached))
+                return cached
         
-        if 'organic_results' not in data:
-            raise ValueError("Pas de résultats organiques dans la réponse")
+        try:
+            response = get_limiter('valueserp').call(_valueserp_request, params, expires_at, expires_at=expires_at)
+            data = response.json()
             
-        return [result['link'] for result in data['organic_results']]
-    except Exception as e:
-        print(f"Erreur lors de la récupération SERP: {str(e)}")
-        return None
+            if 'organic_results' not in data:
+                raise ValueError("Pas de résultats organiques dans la réponse")
+                
+            links = [result['link'] for result in data['organic_results']]
+            if cache is not None:
+                cache.set(cache_key, links)
+            annotate(cache='miss' if cache is not None else None, bytes=len(response.content), results=len(links))
+            return links
+        except Exception as e:
+            annotate(error=type(e).__name__, status=error_status(e))
+            logger.warning("Erreur lors de la récupération SERP: %s", e)
+            return None
 
-def extract_text_from_url(url):
-    """Extrait le texte d'une URL en utilisant trafilatura."""
-    try:
-        downloaded = trafilatura.fetch_url(url)
-        if downloaded:
-            text = trafilatura.extract(downloaded)
-            return text if text else None
-    except Exception as e:
-        print(f"Erreur lors de l'extraction du texte de {url}: {str(e)}")
-    return None
+class PageSkipped(Exception):
+    """Page non analysée ; `reason` en donne la cause : 'time_budget', 'too_large',
+    'content_type', 'deadline', 'fetch_error', 'no_text' ou 'analysis_error'."""
 
-def analyze_url_content(url, textrazor_api_key, language="fr"):
-    """Analyse le contenu d'une URL avec YAKE et TextRazor."""
-    text = extract_text_from_url(url)
-    if not text:
+    def __init__(self, url, reason):
+        super().__init__(f"{url}: {reason}")
+        self.url = url
+        self.reason = reason
+
+def _fetch_text(url, use_cache=True, deadline=PAGE_DEADLINE):
+    """Texte extrait d'une URL ; lève PageSkipped avec la cause en cas d'échec."""
+    with span('fetch', url=url):
+        try:
+            page = fetch_page(url, use_cache=use_cache, deadline=deadline)
+        except FetchRejected as e:
+            annotate(error=e.reason)
+            logger.warning("Page ignorée: %s", e)
+            raise PageSkipped(url, e.reason) from e
+        except Exception as e:
+            annotate(error=type(e).__name__)
+            logger.warning("Erreur lors de l'extraction du texte de %s: %s", url, e)
+            raise PageSkipped(url, 'fetch_error') from e
+        text = page['text'] if page else None
+        annotate(text_length=len(text or ''))
+        if not text:
+            raise PageSkipped(url, 'no_text')
+        return text
+
+def extract_text_from_url(url, use_cache=True, deadline=PAGE_DEADLINE):
+    """Extrait le texte d'une URL en utilisant trafilatura (via le cache de pages)."""
+    try:
+        return _fetch_text(url, use_cache, deadline)
+    except PageSkipped:
         return None
-        
+
+def analyze_page_text(url, text, textrazor_api_key, language="fr", yake_backend=None, expires_at=None):
+    """Analyse YAKE et TextRazor du texte déjà extrait d'une page (None en cas d'échec).
+
+    Passé `expires_at` (time.monotonic), l'appel TextRazor n'est plus envoyé.
+    """
     try:
         # Analyse YAKE
-        keywords_df = extract_keywords(text, language=language)
+        keywords_df = extract_keywords(text, language=language, backend=yake_backend)
         
         # Analyse TextRazor
-        _, topics, entities_df = analyze_text_with_textrazor(text, textrazor_api_key)
+        _, topics, entities_df = analyze_text_with_textrazor(text, textrazor_api_key, language=language,
+                                                             expires_at=expires_at)
         
         return {
             'url': url,
             'text': text,
             'keywords': keywords_df.to_dict('records') if not keywords_df.empty else [],
             'topics': topics if topics else [],
-            'entities': entities_df.to_dict('records') if not entities_df.empty else []
+            'entities': entities_df.to_dict('records') if entities_df is not None and not entities_df.empty else []
         }
     except Exception as e:
-        print(f"Erreur lors de l'analyse de {url}: {str(e)}")
+        annotate(error=type(e).__name__)
+        logger.warning("Erreur lors de l'analyse de %s: %s", url, e)
         return None
 
-def analyze_serp_results(keyword, location, valueserp_api_key, textrazor_api_key, user_url=None, language="fr"):
-    """Analyse complète des résultats SERP avec comparaison."""
+def _remaining(expires_at):
+    """Durée de téléchargement disponible avant l'échéance `expires_at` (time.monotonic)."""
+    if expires_at is None:
+        return PAGE_DEADLINE
+    return min(PAGE_DEADLINE, expires_at - time.monotonic())
+
+def _analyze_url(url, textrazor_api_key, language="fr", host_limiter=None, yake_backend=None,
+                 dedup_index=None, expires_at=None):
+    """Comme `analyze_url_content`, mais lève PageSkipped au lieu de renvoyer None."""
+    with span('url', url=url):
+        if _remaining(expires_at) <= 0:
+            raise PageSkipped(url, 'time_budget')
+        if host_limiter is not None:
+            # Seul le téléchargement est soumis à la limite par hôte
+            with host_limiter.slot(url):
+                deadline = _remaining(expires_at)
+                if deadline <= 0:
+                    raise PageSkipped(url, 'time_budget')
+                text = _fetch_text(url, deadline=deadline)
+        else:
+            text = _fetch_text(url, deadline=_remaining(expires_at))
+
+        representative = False
+        if dedup_index is not None:
+            match = dedup_index.claim(url, text)
+            if match is None:
+                representative = True
+            else:
+                original_url, similarity = match
+                timeout = WAIT_TIMEOUT
+                if expires_at is not None:
+                    timeout = max(0, min(timeout, expires_at - time.monotonic()))
+                original = dedup_index.wait(original_url, timeout)
+                # Si l'analyse du représentant a échoué ou se fait attendre, la page est analysée elle-même
+                if original is not None:
+                    annotate(duplicate_of=original_url, similarity=round(similarity, 3))
+                    return {**original, 'url': url, 'text': text, 'duplicate_of': original_url,
+                            'similarity': similarity}
+
+        analysis = None
+        try:
+            # Une page téléchargée après l'échéance n'est pas analysée (pas d'appel TextRazor)
+            if expires_at is not None and time.monotonic() >= expires_at:
+                raise PageSkipped(url, 'time_budget')
+            analysis = analyze_page_text(url, text, textrazor_api_key, language, yake_backend, expires_at)
+        finally:
+            if representative:
+                dedup_index.publish(url, analysis)
+        if analysis is None:
+            raise PageSkipped(url, 'analysis_error')
+        return analysis
+
+def analyze_url_content(url, textrazor_api_key, language="fr", host_limiter=None, yake_backend=None,
+                        dedup_index=None):
+    """Analyse le contenu d'une URL avec YAKE et TextRazor (None en cas d'échec).
+
+    Avec un `dedup_index` (voir `utils.dedup`), une page quasi identique à une page déjà
+    téléchargée réutilise l'analyse de celle-ci ; le résultat porte alors `duplicate_of`
+    (URL du représentant) et `similarity`.
+    """
     try:
-        # Récupérer les URLs des SERP
-        urls = get_serp_results(keyword, location, valueserp_api_key)
-        if not urls:
-            return None
-            
-        # Limiter à 10 URLs pour l'analyse
-        urls = urls[:10]
-        
-        # Analyser chaque URL
-        analyzed_results = []
-        all_keywords = []
-        all_topics = []
-        all_entities = []
-        
-        for url in urls:
-            result = analyze_url_content(url, textrazor_api_key, language)
-            if result:
-                analyzed_results.append(result)
-                all_keywords.extend(result['keywords'])
-                all_topics.extend(result['topics'])
-                all_entities.extend(result['entities'])
-        
-        # Analyser l'URL de l'utilisateur si fournie
-        user_data = None
-        if user_url:
-            user_data = analyze_url_content(user_url, textrazor_api_key, language)
-        
-        # Agréger les résultats
-        keywords_data = []
-        for kw in all_keywords:
-            keywords_data.append({
-                'keyword': kw['keyword'],
-                'avg_score': kw['score'],
-                'total_occurrences': kw['occurrences'],
-                'urls_count': sum(1 for r in analyzed_results if any(k['keyword'] == kw['keyword'] for k in r['keywords']))
-            })
-
-        # Créer le DataFrame initial
-        df = pd.DataFrame(keywords_data)
-
-        # Créer le DataFrame avec les agrégations de base et les statistiques
-        keywords_df = df.groupby('keyword').agg({
-            'avg_score': 'mean',
-            'total_occurrences': {
-                'total_occurrences': 'sum',
-                'min_occurrences': 'min',
-                'max_occurrences': 'max',
-                'std_occurrences': 'std'
-            },
-            'urls_count': 'max'
-        }).reset_index()
-
-        # Aplatir les colonnes multi-index créées par l'agrégation
-        keywords_df.columns = keywords_df.columns.map('_'.join)
-        keywords_df = keywords_df.rename(columns={'keyword_': 'keyword'})
-        
-        topics_data = []
-        for topic in set(all_topics):
-            count = sum(1 for r in analyzed_results if topic in r['topics'])
-            topics_data.append({
-                'topic': topic,
-                'count': count,
-                'avg_score': count / len(analyzed_results)
-            })
-        
-        topics_df = pd.DataFrame(topics_data)
-        
-        entities_data = []
-        for entity in all_entities:
-            entities_data.append({
-                'entity': entity['entity'],
-                'total_count': entity['count'],
-                'avg_relevance': entity['relevance']
-            })
-        
-        entities_df = pd.DataFrame(entities_data).groupby('entity').agg({
-            'total_count': 'sum',
-            'avg_relevance': 'mean'
-        }).reset_index()
-        
-        result = {
-            'query': keyword,
-            'location': location,
-            'urls': urls,
-            'keywords': keywords_df.to_dict('records'),
-            'topics': topics_df.to_dict('records'),
-            'entities': entities_df.to_dict('records'),
-            'analyzed_results': analyzed_results
+        return _analyze_url(url, textrazor_api_key, language, host_limiter, yake_backend, dedup_index)
+    except PageSkipped:
+        return None
+
+def iter_url_analyses(urls, textrazor_api_key, language="fr", max_workers=DEFAULT_MAX_WORKERS,
+                      max_per_host=DEFAULT_MAX_PER_HOST, executor=None, host_limiter=None, yake_backend=None,
+                      dedup_index=None, time_budget=None, skipped=None, dedup_count=None):
+    """Analyse plusieurs URLs en parallèle et génère (index, analyse) au fil des pages terminées.
+
+    Seules les `dedup_count` premières URLs (toutes par défaut) passent par `dedup_index`.
+    Une URL dont l'analyse échoue donne une analyse None ; si un dict `skipped` est
+    fourni, la cause y est enregistrée sous son index. Avec `time_budget` (secondes), les
+    téléchargements sont bornés par le temps restant et la génération s'arrête à
+    l'échéance : les URLs pas encore terminées y sont notées 'time_budget' et ne sont pas
+    générées. Si le générateur est abandonné avant la fin, les analyses pas encore
+    démarrées sont annulées.
+    """
+    if not urls:
+        return
+    if skipped is None:
+        skipped = {}
+    expires_at = time.monotonic() + time_budget if time_budget is not None else None
+
+    host_limiter = host_limiter or HostLimiter(max_per_host)
+    own_executor = executor is None
+    if own_executor:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(urls))))
+
+    if dedup_count is None:
+        dedup_count = len(urls)
+
+    futures = {}
+    timed_out = False
+    try:
+        futures = {
+            submit_in_context(executor, _analyze_url, url, textrazor_api_key, language, host_limiter,
+                              yake_backend, dedup_index if idx < dedup_count else None, expires_at): idx
+            for idx, url in enumerate(urls)
         }
-        
-        # Ajouter la comparaison si une URL utilisateur est fournie
-        if user_data:
-            result['comparison'] = compare_with_serp(user_data, {
-                'keywords': result['keywords'],
-                'topics': result['topics'],
-                'entities': result['entities']
-            })
-        
+        timeout = max(0, expires_at - time.monotonic()) if expires_at is not None else None
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=timeout):
+                idx = futures[future]
+                try:
+                    analysis = future.result()
+                except PageSkipped as e:
+                    skipped[idx] = e.reason
+                    analysis = None
+                except Exception as e:
+                    logger.warning("Erreur lors de l'analyse de %s: %s", urls[idx], e)
+                    skipped[idx] = 'analysis_error'
+                    analysis = None
+                yield idx, analysis
+        except concurrent.futures.TimeoutError:
+            timed_out = True
+            for future, idx in futures.items():
+                if not future.done():
+                    skipped[idx] = 'time_budget'
+            logger.warning("Budget de temps épuisé : %d URL(s) ignorée(s)",
+                           sum(reason == 'time_budget' for reason in skipped.values()))
+    finally:
+        for future in futures:
+            future.cancel()
+        if own_executor:
+            # À l'échéance, les pages encore en cours (bornées par leur propre délai) ne sont pas attendues
+            executor.shutdown(wait=not timed_out, cancel_futures=True)
+
+def iter_serp_analysis(keyword, location, valueserp_api_key, textrazor_api_key, user_url=None, language="fr",
+                       max_workers=DEFAULT_MAX_WORKERS, max_per_host=DEFAULT_MAX_PER_HOST,
+                       executor=None, host_limiter=None, yake_backend=None, duplicate_policy="drop",
+                       time_budget=None):
+    """Analyse SERP progressive : génère un événement dès qu'une étape se termine.
+
+    - {'event': 'urls', 'urls': [...]} une fois les SERP récupérées ;
+    - {'event': 'page', 'index', 'url', 'analysis', 'is_user_url', 'completed', 'total',
+      'aggregator'} à chaque page analysée (`analysis` vaut None en cas d'échec),
+      `aggregator` (un `SerpAggregator`) contenant les agrégats des pages déjà reçues ;
+    - {'event': 'done', 'result': {...}} avec le rapport complet d'`analyze_serp_results`.
+
+    Les pages quasi dupliquées réutilisent l'analyse de leur représentant et sont listées
+    dans `result['duplicates']` ; selon `duplicate_policy`, elles sont exclues des
+    agrégats ("drop"), comptées comme les autres ("keep"), ou la détection est désactivée
+    ("off").
+
+    Avec `time_budget` (secondes, récupération des SERP comprise), le rapport est produit
+    à l'échéance avec les pages terminées. Les pages non analysées sont listées dans
+    `result['skipped']` avec leur cause (voir `PageSkipped`, 'time_budget' pour celles que
+    le budget n'a pas permis de terminer).
+
+    Rien n'est généré si les SERP n'ont pas pu être récupérées.
+    """
+    started = time.monotonic()
+    # Récupérer les URLs des SERP, limitées à 10 pour l'analyse ; le budget court dès cet appel
+    urls = get_serp_results(keyword, location, valueserp_api_key, deadline=time_budget)
+    if not urls:
+        return
+    urls = urls[:10]
+    yield {'event': 'urls', 'urls': urls}
+
+    # Analyser les URLs (et l'URL de l'utilisateur si fournie) en parallèle ; l'URL de
+    # l'utilisateur reste hors de la détection des quasi-doublons, qui ne regroupe que les SERP
+    targets = urls + [user_url] if user_url else urls
+    aggregator = SerpAggregator()
+    dedup_index = NearDuplicateIndex() if duplicate_policy != "off" else None
+    analyses = [None] * len(urls)
+    user_data = None
+    completed = 0
+    skipped = {}
+    remaining_budget = max(0, time_budget - (time.monotonic() - started)) if time_budget is not None else None
+    for idx, analysis in iter_url_analyses(targets, textrazor_api_key, language, max_workers, max_per_host,
+                                           executor, host_limiter, yake_backend, dedup_index,
+                                           remaining_budget, skipped, dedup_count=len(urls)):
+        completed += 1
+        is_user_url = idx >= len(urls)
+        if is_user_url:
+            user_data = analysis
+        elif analysis:
+            analyses[idx] = analysis
+            if not (analysis.get('duplicate_of') and duplicate_policy == "drop"):
+                with span('aggregation', url=targets[idx]):
+                    aggregator.add(analysis)
+        yield {
+            'event': 'page',
+            'index': idx,
+            'url': targets[idx],
+            'analysis': analysis,
+            'is_user_url': is_user_url,
+            'completed': completed,
+            'total': len(targets),
+            'aggregator': aggregator
+        }
+
+    result = {
+        'query': keyword,
+        'location': location,
+        'urls': urls,
+        **aggregator.snapshot(),
+        'analyzed_results': [analysis for analysis in analyses if analysis],
+        'duplicates': [
+            {'url': analysis['url'], 'duplicate_of': analysis['duplicate_of'], 'similarity': analysis['similarity']}
+            for analysis in analyses if analysis and analysis.get('duplicate_of')
+        ],
+        'skipped': [{'url': targets[idx], 'reason': reason} for idx, reason in sorted(skipped.items())]
+    }
+
+    # Ajouter la comparaison si une URL utilisateur est fournie
+    if user_data:
+        result['comparison'] = compare_with_serp(user_data, {
+            'keywords': result['keywords'],
+            'topics': result['topics'],
+            'entities': result['entities'],
+            # Mêmes pages que les agrégats (sans les quasi-doublons écartés)
+            'analyzed_results': [
+                analysis for analysis in result['analyzed_results']
+                if not (analysis.get('duplicate_of') and duplicate_policy == "drop")
+            ]
+        }, language)
+
+    yield {'event': 'done', 'result': result}
+
+def analyze_serp_results(keyword, location, valueserp_api_key, textrazor_api_key, user_url=None, language="fr",
+                         max_workers=DEFAULT_MAX_WORKERS, max_per_host=DEFAULT_MAX_PER_HOST,
+                         executor=None, host_limiter=None, yake_backend=None, on_progress=None,
+                         duplicate_policy="drop", time_budget=None):
+    """Analyse complète des résultats SERP avec comparaison.
+
+    Les URLs des SERP (et l'URL utilisateur éventuelle) sont analysées en parallèle,
+    avec au plus `max_workers` analyses simultanées et `max_per_host` téléchargements
+    simultanés par hôte. L'ordre des SERP est conservé dans les résultats. Les événements
+    de `iter_serp_analysis` sont transmis à `on_progress` au fil de l'analyse, et les
+    pages quasi dupliquées sont traitées selon `duplicate_policy` ("drop", "keep", "off").
+    Avec `time_budget` (secondes), le rapport est renvoyé à l'échéance avec les pages déjà
+    analysées ; les autres sont listées dans `result['skipped']` avec leur cause.
+
+    Chaque étape est instrumentée (voir `utils.tracing`) : les spans de l'exécution sont
+    renvoyés dans `result['trace']`.
+    """
+    with start_trace(f"serp:{keyword}") as trace:
+        result = None
+        try:
+            with span('serp_report', keyword=keyword):
+                for event in iter_serp_analysis(keyword, location, valueserp_api_key, textrazor_api_key, user_url,
+                                                language, max_workers, max_per_host, executor, host_limiter,
+                                                yake_backend, duplicate_policy, time_budget):
+                    if event['event'] == 'done':
+                        result = event['result']
+                    if on_progress:
+                        on_progress(event)
+        except Exception as e:
+            logger.warning("Erreur lors de l'analyse SERP: %s", e)
+            return None
+        if result is not None:
+            result['trace'] = trace.records()
         return result
-        
-    except Exception as e:
-        print(f"Erreur lors de l'analyse SERP: {str(e)}")
-        return None
 
-def compare_with_serp(user_data, serp_data):
-    """Compare les données de l'URL utilisateur avec les données SERP."""
+def compare_with_serp(user_data, serp_data, language="fr"):
+    """Compare les données de l'URL utilisateur avec les données SERP.
+
+    Si le texte de la page et celui des pages SERP (`analyzed_results`) sont disponibles,
+    la comparaison inclut aussi `similarity` : similarités TF-IDF avec chaque concurrent
+    et avec le centroïde des SERP, et écarts de poids par terme (voir `utils.similarity`).
+    """
     if not user_data or not serp_data:
         return None
-        
-    comparison = {
-        'missing_keywords': [],
-        'keyword_gaps': [],
-        'missing_topics': [],
-        'topic_coverage': 0,
-        'entity_coverage': 0,
-        'recommendations': []
-    }
-    
-    # Analyse des mots-clés manquants
-    serp_keywords = {k['keyword']: k for k in serp_data['keywords']}
-    user_keywords = {k['keyword']: k for k in user_data['keywords']}
-    
-    for kw, data in serp_keywords.items():
-        if kw not in user_keywords and data['urls_count'] >= 3:
-            comparison['missing_keywords'].append({
-                'keyword': kw,
-                'importance': data['urls_count'],
-                'serp_occurrences': data['total_occurrences']
-            })
-    
-    # Analyse des topics manquants
-    serp_topics = set(t['topic'] for t in serp_data['topics'])
-    user_topics = set(user_data['topics'])
-    
-    comparison['missing_topics'] = [
-        {'topic': topic} for topic in serp_topics - user_topics
-    ]
-    
-    # Calculer les couvertures
-    if serp_topics:
-        comparison['topic_coverage'] = (len(user_topics) / len(serp_topics)) * 100
-    
-    # Générer des recommandations
-    if comparison['missing_keywords']:
-        comparison['recommendations'].append({
-            'priority': 'high',
-            'message': f"Ajouter les mots-clés manquants importants : {', '.join([k['keyword'] for k in comparison['missing_keywords'][:5]])}"
-        })
-    
-    if comparison['missing_topics']:
-        comparison['recommendations'].append({
-            'priority': 'medium',
-            'message': f"Couvrir les thématiques manquantes : {', '.join([t['topic'] for t in comparison['missing_topics'][:3]])}"
-        })
-    
+    comparison = SerpProfile.from_serp_data(serp_data).compare(user_data)
+    pages = [page for page in serp_data.get('analyzed_results') or [] if page.get('text')]
+    if pages and user_data.get('text'):
+        with span('similarity', pages=len(pages)):
+            model = SerpSimilarity([page['text'] for page in pages], [page['url'] for page in pages], language)
+            comparison['similarity'] = model.score(user_data['text'])
     return comparison
+
+def audit_urls(profile, urls, textrazor_api_key, language="fr", max_workers=DEFAULT_MAX_WORKERS,
+               max_per_host=DEFAULT_MAX_PER_HOST, executor=None, host_limiter=None, yake_backend=None,
+               on_report=None):
+    """Analyse plusieurs pages en parallèle et compare chacune au même `SerpProfile`.
+
+    Renvoie un rapport par URL, dans l'ordre des URLs : {'url', 'comparison'} ou
+    {'url', 'error', 'reason'}. Chaque rapport est transmis à `on_report` dès qu'il est
+    prêt ; le texte des pages n'est pas conservé.
+    """
+    reports = [None] * len(urls)
+    skipped = {}
+    for idx, analysis in iter_url_analyses(urls, textrazor_api_key, language, max_workers, max_per_host,
+                                           executor, host_limiter, yake_backend, skipped=skipped):
+        report = {'url': urls[idx]}
+        if analysis:
+            report['comparison'] = profile.compare(analysis)
+        else:
+            report['error'] = "Analyse de la page impossible"
+            report['reason'] = skipped.get(idx)
+        reports[idx] = report
+        if on_report:
+            on_report(report)
+    return reports
@@ -0,0 +1,160 @@
+import json
+from .text_analysis import build_keyword_automaton, count_keyword_occurrences, tokenize
+
+# Un mot-clé est jugé important s'il apparaît dans au moins ce nombre de pages des SERP
+MISSING_KEYWORD_MIN_URLS = 3
+# Sous-utilisé : moins de la moitié des occurrences moyennes des pages des SERP qui l'emploient
+UNDERUSED_RATIO = 0.5
+
+
+class SerpProfile:
+    """Profil d'une SERP compilé une fois : index des mots-clés, fréquences documentaires,
+    topics et entités. Sérialisable en JSON et réutilisable pour comparer autant de pages
+    que nécessaire sans refaire l'analyse des SERP.
+    """
+
+    def __init__(self, keywords, topics, entities, pages=0, query=None, location=None):
+        # mot-clé -> {'urls_count', 'total_occurrences', 'avg_occurrences'}
+        self.keywords = keywords
+        # topic -> nombre de pages qui le traitent
+        self.topics = topics
+        # entité -> {'total_count', 'avg_relevance'}
+        self.entities = entities
+        self.pages = pages
+        self.query = query
+        self.location = location
+
+        self._important = sorted(
+            (kw for kw, stats in keywords.items() if stats['urls_count'] >= MISSING_KEYWORD_MIN_URLS),
+            key=lambda kw: (-keywords[kw]['urls_count'], -keywords[kw]['total_occurrences'], kw)
+        )
+        self._topic_order = sorted(topics, key=lambda topic: (-topics[topic], topic))
+        self._automaton = None
+
+    @classmethod
+    def from_serp_data(cls, serp_data):
+        """Compile le profil à partir d'un résultat d'`analyze_serp_results` (ou de ses agrégats)."""
+        keywords = {}
+        for kw in serp_data['keywords']:
+            keywords[kw['keyword']] = {
+                'urls_count': kw['urls_count'],
+                'total_occurrences': kw['total_occurrences'],
+                'avg_occurrences': kw['total_occurrences'] / kw['urls_count'] if kw['urls_count'] else 0.0
+            }
+        topics = {t['topic']: t['count'] for t in serp_data['topics']}
+        entities = {
+            e['entity']: {'total_count': e['total_count'], 'avg_relevance': e['avg_relevance']}
+            for e in serp_data['entities']
+        }
+        return cls(
+            keywords, topics, entities,
+            pages=len(serp_data.get('analyzed_results') or serp_data.get('urls') or []),
+            query=serp_data.get('query'),
+            location=serp_data.get('location')
+        )
+
+    def to_dict(self):
+        return {
+            'query': self.query,
+            'location': self.location,
+            'pages': self.pages,
+            'keywords': self.keywords,
+            'topics': self.topics,
+            'entities': self.entities
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['keywords'], data['topics'], data['entities'], data.get('pages', 0),
+                   data.get('query'), data.get('location'))
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def _user_occurrences(self, user_data):
+        # Avec le texte de la page, toutes les occurrences des mots-clés du profil sont comptées
+        # (et pas seulement celles des mots-clés extraits de la page)
+        if user_data.get('text'):
+            if self._automaton is None:
+                self._automaton = build_keyword_automaton(self._important)
+            return count_keyword_occurrences(self._automaton, tokenize(user_data['text']))
+        return {k['keyword']: k['occurrences'] for k in user_data['keywords']}
+
+    def compare(self, user_data):
+        """Compare une page analysée (dict d'`analyze_url_content`) au profil."""
+        comparison = {
+            'missing_keywords': [],
+            'keyword_gaps': [],
+            'missing_topics': [],
+            'missing_entities': [],
+            'topic_coverage': 0,
+            'entity_coverage': 0,
+            'recommendations': []
+        }
+
+        # Mots-clés manquants ou sous-utilisés
+        occurrences = self._user_occurrences(user_data)
+        for kw in self._important:
+            stats = self.keywords[kw]
+            used = occurrences.get(kw, 0)
+            if not used:
+                comparison['missing_keywords'].append({
+                    'keyword': kw,
+                    'importance': stats['urls_count'],
+                    'serp_occurrences': stats['total_occurrences']
+                })
+            elif used < stats['avg_occurrences'] * UNDERUSED_RATIO:
+                comparison['keyword_gaps'].append({
+                    'keyword': kw,
+                    'importance': stats['urls_count'],
+                    'user_occurrences': used,
+                    'serp_avg_occurrences': stats['avg_occurrences']
+                })
+
+        # Topics et entités
+        user_topics = set(user_data['topics'])
+        comparison['missing_topics'] = [{'topic': topic} for topic in self._topic_order if topic not in user_topics]
+        if self.topics:
+            comparison['topic_coverage'] = len(user_topics & self.topics.keys()) / len(self.topics) * 100
+
+        user_entities = {e['entity'] for e in user_data['entities']}
+        comparison['missing_entities'] = [
+            {'entity': entity, 'total_count': stats['total_count']}
+            for entity, stats in sorted(self.entities.items(), key=lambda item: -item[1]['total_count'])
+            if entity not in user_entities
+        ]
+        if self.entities:
+            comparison['entity_coverage'] = len(user_entities & self.entities.keys()) / len(self.entities) * 100
+
+        # Générer des recommandations
+        if comparison['missing_keywords']:
+            comparison['recommendations'].append({
+                'priority': 'high',
+                'message': f"Ajouter les mots-clés manquants importants : {', '.join([k['keyword'] for k in comparison['missing_keywords'][:5]])}"
+            })
+
+        if comparison['keyword_gaps']:
+            comparison['recommendations'].append({
+                'priority': 'medium',
+                'message': f"Renforcer les mots-clés sous-utilisés : {', '.join([k['keyword'] for k in comparison['keyword_gaps'][:5]])}"
+            })
+
+        if comparison['missing_topics']:
+            comparison['recommendations'].append({
+                'priority': 'medium',
+                'message': f"Couvrir les thématiques manquantes : {', '.join([t['topic'] for t in comparison['missing_topics'][:3]])}"
+            })
+
+        if comparison['missing_entities']:
+            comparison['recommendations'].append({
+                'priority': 'low',
+                'message': f"Mentionner les entités fréquentes des SERP : {', '.join([e['entity'] for e in comparison['missing_entities'][:5]])}"
+            })
+
+        return comparison
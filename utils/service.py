@@ -0,0 +1,383 @@
+"""Service local d'analyse : file de jobs et pool de workers partagés par plusieurs clients.
+
+Usage :
+    python -m utils.service --port 8765 --workers 4 --concurrency 20
+
+Les analyses (extraction YAKE, TextRazor, analyse d'URL, analyse SERP, comparaison,
+audit) sont soumises comme des jobs et exécutées dans un même processus, avec les
+extracteurs YAKE préchauffés, les caches disque, le budget global d'URLs simultanées et
+les limiteurs des API partagés entre tous les clients (voir `utils.service_client`).
+
+API HTTP (JSON) :
+    POST /jobs                 {"type": ..., "params": {...}} -> 202 {"id", "status", ...}
+    GET  /jobs/<id>            état du job (et résultat une fois terminé)
+    GET  /jobs/<id>/events     flux NDJSON des événements, du premier au 'done' / 'error'
+    GET  /health               état du service : jobs, limiteurs des API et caches
+
+Le service n'a pas d'authentification : il écoute par défaut sur 127.0.0.1 uniquement.
+"""
+import argparse
+import concurrent.futures
+import inspect
+import json
+import logging
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from .extractor_pool import DEFAULT_LANGUAGES, DEFAULT_TOP, warm_up
+from .page_cache import get_page_cache
+from .rate_limit import PROVIDER_LIMITS, get_limiter
+from .serp_analysis import (
+    DEFAULT_MAX_PER_HOST,
+    HostLimiter,
+    analyze_serp_results,
+    analyze_url_content,
+    audit_urls,
+    compare_with_serp,
+    get_serp_cache
+)
+from .serp_profile import SerpProfile
+from .text_analysis import analyze_text_with_textrazor, extract_keywords, get_textrazor_cache
+from .yake_workers import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_JOB_WORKERS = 4
+DEFAULT_URL_CONCURRENCY = 20
+# Les jobs terminés restent consultables une heure
+JOB_TTL = 3600
+# Ligne envoyée sur un flux d'événements resté silencieux, pour garder la connexion ouverte
+HEARTBEAT_INTERVAL = 15
+
+
+class Job:
+    """Job soumis au service : état, événements émis et résultat."""
+
+    def __init__(self, job_type, params):
+        self.id = uuid.uuid4().hex
+        self.type = job_type
+        self.params = params
+        self.status = 'queued'
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.events = []
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'error')
+
+    def emit(self, event):
+        with self._cond:
+            self.events.append({'seq': len(self.events), **event})
+            self._cond.notify_all()
+
+    def start(self):
+        with self._cond:
+            self.status = 'running'
+            self.started_at = time.time()
+
+    def finish(self, result=None, error=None):
+        with self._cond:
+            self.result = result
+            self.error = error
+            self.status = 'error' if error else 'done'
+            self.finished_at = time.time()
+            if error:
+                self.events.append({'seq': len(self.events), 'event': 'error', 'error': error})
+            else:
+                self.events.append({'seq': len(self.events), 'event': 'done', 'result': result})
+            self._cond.notify_all()
+
+    def wait_events(self, since, timeout):
+        """Événements à partir de `since`, en attendant au plus `timeout` s qu'il en arrive."""
+        with self._cond:
+            if len(self.events) <= since and not self.finished:
+                self._cond.wait(timeout)
+            return self.events[since:]
+
+    def describe(self, with_result=False):
+        """État du job (sans ses paramètres, qui contiennent les clés API)."""
+        description = {
+            'id': self.id,
+            'type': self.type,
+            'status': self.status,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'events': len(self.events)
+        }
+        if with_result and self.finished:
+            description['result'] = self.result
+            description['error'] = self.error
+        return description
+
+
+def _serialize_serp_event(event):
+    """Événement d'`analyze_serp_results` sans objets Python (agrégats partiels en listes)."""
+    if event['event'] != 'page':
+        return None if event['event'] == 'done' else event
+    analysis = event['analysis']
+    serialized = {k: v for k, v in event.items() if k not in ('analysis', 'aggregator')}
+    serialized['status'] = 'failed' if not analysis else 'duplicate' if analysis.get('duplicate_of') else 'ok'
+    serialized['duplicate_of'] = analysis.get('duplicate_of') if analysis else None
+    aggregator = event['aggregator']
+    serialized['partial'] = {'pages': aggregator.pages, **aggregator.snapshot()}
+    return serialized
+
+
+def _run_extract_keywords(service, job, text, language="fr", max_keywords=20):
+    keywords_df = extract_keywords(text, language=language, max_keywords=max_keywords, backend=service.yake_backend)
+    # Colonnes conservées même sans mot-clé, pour reconstruire le DataFrame côté client
+    return {'columns': list(keywords_df.columns), 'data': keywords_df.values.tolist()}
+
+
+def _run_textrazor(service, job, text_or_url, textrazor_api_key, is_url=False, language=None):
+    text, topics, entities_df = analyze_text_with_textrazor(text_or_url, textrazor_api_key, is_url=is_url,
+                                                           language=language)
+    return {
+        'text': text,
+        'topics': topics,
+        'entities': entities_df.to_dict('records') if entities_df is not None else None
+    }
+
+
+def _run_analyze_url(service, job, url, textrazor_api_key, language="fr"):
+    return analyze_url_content(url, textrazor_api_key, language, service.host_limiter, service.yake_backend)
+
+
+def _run_analyze_serp(service, job, keyword, location, valueserp_api_key, textrazor_api_key, user_url=None,
+                      language="fr", duplicate_policy="drop", time_budget=None):
+    def forward(event):
+        serialized = _serialize_serp_event(event)
+        if serialized is not None:
+            job.emit(serialized)
+
+    return analyze_serp_results(keyword, location, valueserp_api_key, textrazor_api_key, user_url, language,
+                                executor=service.url_executor, host_limiter=service.host_limiter,
+                                yake_backend=service.yake_backend, on_progress=forward,
+                                duplicate_policy=duplicate_policy, time_budget=time_budget)
+
+
+def _run_compare_with_serp(service, job, user_data, serp_data, language="fr"):
+    return compare_with_serp(user_data, serp_data, language)
+
+
+def _run_audit(service, job, profile, urls, textrazor_api_key, language="fr"):
+    return audit_urls(SerpProfile.from_dict(profile), urls, textrazor_api_key, language,
+                      executor=service.url_executor, host_limiter=service.host_limiter,
+                      yake_backend=service.yake_backend,
+                      on_report=lambda report: job.emit({'event': 'report', 'report': report}))
+
+
+JOB_HANDLERS = {
+    'extract_keywords': _run_extract_keywords,
+    'textrazor': _run_textrazor,
+    'analyze_url': _run_analyze_url,
+    'analyze_serp': _run_analyze_serp,
+    'compare_with_serp': _run_compare_with_serp,
+    'audit': _run_audit
+}
+
+
+class AnalysisService:
+    """File de jobs exécutés par `workers` threads, avec des ressources partagées.
+
+    Les téléchargements et analyses d'URLs de tous les jobs passent par un même pool de
+    `url_concurrency` threads et un même `HostLimiter`, comme en mode batch. Avec
+    `yake_processes` (0 : un processus par cœur), l'extraction YAKE est répartie sur un
+    pool de processus.
+    """
+
+    def __init__(self, workers=DEFAULT_JOB_WORKERS, url_concurrency=DEFAULT_URL_CONCURRENCY,
+                 max_per_host=DEFAULT_MAX_PER_HOST, yake_processes=None, job_ttl=JOB_TTL):
+        self.job_ttl = job_ttl
+        self.yake_backend = None
+        if yake_processes is not None:
+            get_process_pool(yake_processes or None)
+            self.yake_backend = 'process'
+        warm_up(DEFAULT_LANGUAGES, tops=(DEFAULT_TOP,))
+        self.host_limiter = HostLimiter(max_per_host)
+        self.url_executor = concurrent.futures.ThreadPoolExecutor(max_workers=url_concurrency)
+        self._job_executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self.workers = workers
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job_type, params):
+        """Met un job en file ; ValueError si le type ou les paramètres sont invalides."""
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"Type de job inconnu : {job_type}")
+        params = params or {}
+        try:
+            inspect.signature(JOB_HANDLERS[job_type]).bind(self, None, **params)
+        except TypeError as e:
+            raise ValueError(f"Paramètres invalides pour {job_type} : {e}") from e
+        job = Job(job_type, params)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._job_executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job):
+        job.start()
+        try:
+            result = JOB_HANDLERS[job.type](self, job, **job.params)
+        except Exception as e:
+            logger.exception("Job %s (%s) en échec", job.id, job.type)
+            job.finish(error=f"{type(e).__name__}: {e}")
+        else:
+            job.finish(result=result)
+
+    def _prune(self):
+        expired_before = time.time() - self.job_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < expired_before]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            'status': 'ok',
+            'workers': self.workers,
+            'jobs': counts,
+            'limits': {name: get_limiter(name).stats() for name in PROVIDER_LIMITS},
+            'caches': {
+                'pages': get_page_cache().stats(),
+                'textrazor': get_textrazor_cache().stats(),
+                'serp': get_serp_cache().stats()
+            }
+        }
+
+    def shutdown(self):
+        self._job_executor.shutdown(wait=False, cancel_futures=True)
+        self.url_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """Routes HTTP du service ; `self.server.service` est l'`AnalysisService`."""
+
+    protocol_version = 'HTTP/1.0'
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status, data):
+        body = _dumps(data)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_or_404(self, job_id):
+        job = self.server.service.get(job_id)
+        if job is None:
+            self._send_json(404, {'error': f"Job inconnu : {job_id}"})
+        return job
+
+    def do_GET(self):
+        parts = [part for part in urlsplit(self.path).path.split('/') if part]
+        if parts == ['health']:
+            self._send_json(200, self.server.service.stats())
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            job = self._job_or_404(parts[1])
+            if job is not None:
+                self._send_json(200, job.describe(with_result=True))
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+            job = self._job_or_404(parts[1])
+            if job is not None:
+                self._stream_events(job)
+        else:
+            self._send_json(404, {'error': "Route inconnue"})
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip('/') != '/jobs':
+            self._send_json(404, {'error': "Route inconnue"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+            job = self.server.service.submit(payload.get('type'), payload.get('params'))
+        except (ValueError, AttributeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        self._send_json(202, job.describe())
+
+    def _stream_events(self, job):
+        """Envoie les événements du job au fil de l'eau, une ligne JSON chacun, jusqu'à la fin."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.end_headers()
+        sent = 0
+        try:
+            while True:
+                events = job.wait_events(sent, HEARTBEAT_INTERVAL)
+                if not events:
+                    self.wfile.write(_dumps({'event': 'heartbeat'}) + b'\n')
+                for event in events:
+                    self.wfile.write(_dumps(event) + b'\n')
+                sent += len(events)
+                self.wfile.flush()
+                if events and events[-1]['event'] in ('done', 'error'):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            # Client parti : le job continue, ses événements restent consultables
+            return
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, service=None):
+    """Démarre le serveur HTTP du service (bloquant)."""
+    service = service or AnalysisService()
+    server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    logger.info("Service d'analyse à l'écoute sur http://%s:%d", host, server.server_port)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service local d'analyse SEO (file de jobs HTTP).")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_JOB_WORKERS, help="Jobs exécutés simultanément")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_URL_CONCURRENCY,
+                        help="Budget global d'URLs analysées simultanément")
+    parser.add_argument('--max-per-host', type=int, default=DEFAULT_MAX_PER_HOST)
+    parser.add_argument('--yake-processes', type=int, nargs='?', const=0, default=None,
+                        help="Extraction YAKE dans un pool de processus (sans valeur : un par cœur)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    service = AnalysisService(args.workers, args.concurrency, args.max_per_host, args.yake_processes)
+    try:
+        serve(args.host, args.port, service)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import json
+import os
+import requests
+
+DEFAULT_SERVICE_URL = os.environ.get('YAKE_V4_SERVICE_URL')
+SUBMIT_TIMEOUT = (5, 30)
+# Délai de lecture du flux d'événements : le service envoie un battement toutes les 15 s
+EVENTS_TIMEOUT = (5, 60)
+
+
+class ServiceError(Exception):
+    """Erreur renvoyée par le service d'analyse (job refusé ou en échec)."""
+
+
+class AnalysisClient:
+    """Client du service local d'analyse (voir `utils.service`)."""
+
+    def __init__(self, base_url=DEFAULT_SERVICE_URL):
+        self.base_url = base_url.rstrip('/')
+        self._session = requests.Session()
+
+    def _json(self, response):
+        try:
+            data = response.json()
+        except ValueError:
+            response.raise_for_status()
+            raise
+        if response.status_code >= 400:
+            raise ServiceError(data.get('error') or f"HTTP {response.status_code}")
+        return data
+
+    def health(self):
+        return self._json(self._session.get(f"{self.base_url}/health", timeout=SUBMIT_TIMEOUT))
+
+    def submit(self, job_type, **params):
+        """Soumet un job et renvoie son identifiant."""
+        response = self._session.post(f"{self.base_url}/jobs", json={'type': job_type, 'params': params},
+                                      timeout=SUBMIT_TIMEOUT)
+        return self._json(response)['id']
+
+    def status(self, job_id):
+        """État du job, avec `result` / `error` une fois terminé."""
+        return self._json(self._session.get(f"{self.base_url}/jobs/{job_id}", timeout=SUBMIT_TIMEOUT))
+
+    def events(self, job_id):
+        """Génère les événements du job au fil de l'eau, jusqu'au 'done' ou 'error' inclus."""
+        with self._session.get(f"{self.base_url}/jobs/{job_id}/events", stream=True,
+                               timeout=EVENTS_TIMEOUT) as response:
+            if response.status_code >= 400:
+                self._json(response)
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event['event'] != 'heartbeat':
+                    yield event
+
+    def run(self, job_type, on_event=None, **params):
+        """Soumet un job, transmet ses événements à `on_event` et renvoie son résultat."""
+        job_id = self.submit(job_type, **params)
+        for event in self.events(job_id):
+            if event['event'] == 'done':
+                return event['result']
+            if event['event'] == 'error':
+                raise ServiceError(event['error'])
+            if on_event:
+                on_event(event)
+        raise ServiceError(f"Flux d'événements du job {job_id} interrompu")
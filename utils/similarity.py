@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from .extractor_pool import get_extractor
+from .startup import lazy_import
+from .text_analysis import tokenize
+
+# Un terme n'entre dans les écarts que s'il apparaît dans au moins ce nombre de pages des SERP
+GAP_MIN_URLS = 2
+MAX_TERM_GAPS = 30
+
+
+def page_terms(text, stopwords):
+    """Termes d'une page : mots et bigrammes de mots consécutifs, hors mots vides et nombres."""
+    tokens = np.array(tokenize(text), dtype=object)
+    if not len(tokens):
+        return tokens
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    keep = ~pd.Series(tokens).isin(stopwords).to_numpy() & (lengths > 1) & ~np.char.isdigit(tokens.astype(str))
+    bigrams = keep[:-1] & keep[1:]
+    return np.concatenate((tokens[keep], tokens[:-1][bigrams] + ' ' + tokens[1:][bigrams]))
+
+
+def _sublinear_tfidf(counts, idf):
+    """Pondération (1 + log tf) · idf, lignes normalisées (norme L2)."""
+    sparse = lazy_import('scipy.sparse')
+    weights = counts.astype(float)
+    weights.data = 1 + np.log(weights.data)
+    weights = weights @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ weights
+
+
+class SerpSimilarity:
+    """Modèle TF-IDF des pages d'une SERP, construit une fois pour noter autant de pages que voulu.
+
+    Les termes de toutes les pages sont codés en une passe (pd.factorize) dans une matrice
+    creuse pages × termes ; l'idf est calculé sur les pages des SERP. Une page est notée
+    par produits matriciels : similarité cosinus avec chaque concurrent et avec le
+    centroïde des SERP, et écarts de poids par terme avec ce centroïde.
+    """
+
+    def __init__(self, texts, urls=None, language="fr"):
+        if not texts:
+            raise ValueError("Aucune page SERP pour construire le modèle")
+        self.urls = list(urls) if urls is not None else list(range(len(texts)))
+        self._stopwords = getattr(get_extractor(language), 'stopword_set', set())
+
+        terms = [page_terms(text, self._stopwords) for text in texts]
+        rows = np.repeat(np.arange(len(terms)), [len(page) for page in terms])
+        codes, vocabulary = pd.factorize(np.concatenate(terms))
+        self.vocabulary = pd.Index(vocabulary)
+        sparse = lazy_import('scipy.sparse')
+        counts = sparse.csr_matrix((np.ones(len(codes)), (rows, codes)), shape=(len(texts), len(vocabulary)))
+        counts.sum_duplicates()
+
+        # Nombre de pages contenant chaque terme, puis idf lissé
+        self.document_frequency = np.bincount(counts.indices, minlength=len(vocabulary))
+        self.idf = np.log((1 + len(texts)) / (1 + self.document_frequency)) + 1
+        self._oov_idf = np.log(1 + len(texts)) + 1
+        self.matrix = _sublinear_tfidf(counts, self.idf).tocsr()
+
+        centroid = np.asarray(self.matrix.mean(axis=0)).ravel()
+        norm = np.linalg.norm(centroid)
+        self.centroid = centroid / norm if norm else centroid
+
+    def vectorize(self, text):
+        """Vecteur TF-IDF normalisé d'une page dans le vocabulaire des SERP (dense)."""
+        terms, counts = np.unique(page_terms(text, self._stopwords), return_counts=True)
+        codes = self.vocabulary.get_indexer(terms)
+        known = codes >= 0
+        idf = np.full(len(codes), self._oov_idf)
+        idf[known] = self.idf[codes[known]]
+        weights = (1 + np.log(counts)) * idf
+        # Les termes absents des SERP comptent dans la norme : ils diluent la similarité
+        norm = np.linalg.norm(weights)
+        vector = np.zeros(len(self.vocabulary))
+        if norm:
+            vector[codes[known]] = weights[known] / norm
+        return vector
+
+    def score(self, text, max_gaps=MAX_TERM_GAPS):
+        """Similarités et écarts de termes d'une page face aux SERP."""
+        vector = self.vectorize(text)
+        similarities = self.matrix @ vector
+        competitors_to_centroid = self.matrix @ self.centroid
+
+        # Termes pondérés plus fortement dans les SERP que dans la page
+        gaps = self.centroid - vector
+        candidates = np.flatnonzero((gaps > 0) & (self.document_frequency >= GAP_MIN_URLS))
+        if len(candidates) > max_gaps:
+            candidates = candidates[np.argpartition(-gaps[candidates], max_gaps)[:max_gaps]]
+        candidates = candidates[np.argsort(-gaps[candidates], kind='stable')]
+
+        return {
+            'centroid_similarity': float(vector @ self.centroid),
+            'serp_avg_centroid_similarity': float(competitors_to_centroid.mean()) if len(self.urls) else 0.0,
+            'competitors': [
+                {'url': url, 'similarity': float(similarity)}
+                for url, similarity in sorted(zip(self.urls, similarities), key=lambda item: -item[1])
+            ],
+            'term_gaps': [
+                {
+                    'term': self.vocabulary[code],
+                    'serp_weight': float(self.centroid[code]),
+                    'user_weight': float(vector[code]),
+                    'gap': float(gaps[code]),
+                    'urls_count': int(self.document_frequency[code])
+                }
+                for code in candidates
+            ]
+        }
@@ -0,0 +1,81 @@
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Ressources NLTK utilisées par l'application et leur chemin dans nltk_data
+NLTK_RESOURCES = {
+    'stopwords': 'corpora/stopwords',
+    'punkt': 'tokenizers/punkt'
+}
+NLTK_DATA_DIR = os.path.join(os.path.expanduser('~'), 'nltk_data')
+
+_timings = {}
+_timings_lock = threading.Lock()
+_nltk_lock = threading.Lock()
+_nltk_status = None
+
+
+@contextmanager
+def timed(name):
+    """Mesure la durée d'une étape d'initialisation (seule la première mesure est conservée)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _timings_lock:
+            _timings.setdefault(name, elapsed)
+
+
+def lazy_import(module_name):
+    """Importe un module au moment où il est nécessaire et mesure le premier import."""
+    module = sys.modules.get(module_name)
+    if module is not None and not getattr(module.__spec__, '_initializing', False):
+        return module
+    # Module absent, ou en cours d'import dans un autre thread : import_module attend la fin
+    with timed(f"import {module_name}"):
+        return importlib.import_module(module_name)
+
+
+def ensure_nltk_resources(resources=NLTK_RESOURCES, download_dir=NLTK_DATA_DIR):
+    """Vérifie (une seule fois par processus) la présence des ressources NLTK.
+
+    Seules les ressources absentes sont téléchargées ; sans réseau, les ressources déjà
+    installées suffisent. Renvoie {ressource: 'present' | 'downloaded' | 'missing'}.
+    """
+    global _nltk_status
+    with _nltk_lock:
+        if _nltk_status is not None:
+            return dict(_nltk_status)
+
+        with timed("nltk"):
+            nltk = lazy_import('nltk')
+            if download_dir not in nltk.data.path:
+                nltk.data.path.append(download_dir)
+
+            status = {}
+            for name, path in resources.items():
+                try:
+                    nltk.data.find(path)
+                    status[name] = 'present'
+                    continue
+                except LookupError:
+                    pass
+                try:
+                    os.makedirs(download_dir, exist_ok=True)
+                    downloaded = nltk.download(name, download_dir=download_dir, quiet=True, raise_on_error=True)
+                    status[name] = 'downloaded' if downloaded else 'missing'
+                except Exception:
+                    status[name] = 'missing'
+
+        _nltk_status = status
+        return dict(status)
+
+
+def startup_timings():
+    """Durées (en secondes) des imports et initialisations mesurés dans ce processus."""
+    with _timings_lock:
+        return dict(_timings)
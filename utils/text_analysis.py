@@ -1,59 +1,273 @@
-import yake
-from textrazor import TextRazor
+import hashlib
+import json
+import logging
+import math
+import re
 import pandas as pd
 from collections import Counter
+from .cache import get_cache
+from .chunking import DEFAULT_CHUNK_WORDS, DEFAULT_OVERLAP_SENTENCES, iter_chunks
+from .extractor_pool import checkout_extractor
+from .page_cache import normalize_url
+from .rate_limit import error_status, get_limiter
+from .startup import lazy_import
+from .tracing import annotate, span
 
-def extract_keywords(text, language="fr", max_keywords=20):
-    """Extrait les mots-clés d'un texte avec YAKE."""
-    kw_extractor = yake.KeywordExtractor(
-        lan=language,
-        n=3,
-        dedupLim=0.9,
-        top=max_keywords
-    )
-    keywords = kw_extractor.extract_keywords(text)
-    
-    # Créer le DataFrame avec les bonnes colonnes
-    df = pd.DataFrame(keywords, columns=['keyword', 'score'])
-    df['occurrences'] = df['keyword'].apply(lambda x: text.lower().count(x.lower()))
-    df['occurrences_per_1000_words'] = df['occurrences'] * 1000 / len(text.split())
+logger = logging.getLogger(__name__)
+
+TEXTRAZOR_EXTRACTORS = ["entities", "topics"]
+TEXTRAZOR_CACHE_TTL = 30 * 24 * 3600
+TEXTRAZOR_CACHE_MAX_BYTES = 128 * 1024 * 1024
+# Codes ISO 639-2 attendus par TextRazor pour les langues de l'application
+TEXTRAZOR_LANGUAGES = {'fr': 'fre', 'en': 'eng', 'es': 'spa', 'de': 'ger', 'it': 'ita'}
+# Au-delà de cette taille, l'extraction YAKE passe automatiquement en mode par fenêtres
+CHUNKED_EXTRACTION_MIN_CHARS = 500 * 1000
+
+_TOKEN_RE = re.compile(r"\w+")
+# Clé réservée dans les nœuds du trie pour les mots-clés qui s'y terminent
+_MATCH = None
+
+def tokenize(text):
+    """Découpe un texte en mots minuscules."""
+    return _TOKEN_RE.findall(text.lower())
+
+def build_keyword_automaton(keywords):
+    """Construit un trie de tokens à partir des mots-clés (n-grammes)."""
+    root = {}
+    for keyword in keywords:
+        tokens = tokenize(keyword)
+        if not tokens:
+            continue
+        node = root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(_MATCH, []).append(keyword)
+    return root
+
+def count_keyword_occurrences(automaton, tokens):
+    """Compte en une passe les occurrences de tous les mots-clés du trie.
+
+    Les correspondances se font sur des mots entiers : « art » n'est pas compté dans « party ».
+    """
+    counts = Counter()
+    n_tokens = len(tokens)
+    for start in range(n_tokens):
+        node = automaton.get(tokens[start])
+        pos = start + 1
+        while node is not None:
+            for keyword in node.get(_MATCH, ()):
+                counts[keyword] += 1
+            if pos >= n_tokens:
+                break
+            node = node.get(tokens[pos])
+            pos += 1
+    return counts
+
+def extract_keyword_rows(text, language="fr", max_keywords=20, chunk_words=None):
+    """Extrait les mots-clés sous forme compacte.
+
+    Renvoie ([(keyword, score, occurrences), ...], nombre de mots du texte). Les textes
+    très longs (ou tous si `chunk_words` est fourni) sont traités par fenêtres.
+    """
+    if chunk_words or len(text) >= CHUNKED_EXTRACTION_MIN_CHARS:
+        return extract_keyword_rows_chunked(text, language, max_keywords, chunk_words or DEFAULT_CHUNK_WORDS)
+
+    with checkout_extractor(language, n=3, dedup_lim=0.9, top=max_keywords) as kw_extractor:
+        keywords = kw_extractor.extract_keywords(text)
+
+    # Comptage des occurrences en une seule passe sur le texte tokenisé
+    tokens = tokenize(text)
+    counts = count_keyword_occurrences(build_keyword_automaton(kw for kw, _ in keywords), tokens)
+    return [(kw, score, counts[kw]) for kw, score in keywords], len(tokens)
+
+def extract_keyword_rows_chunked(source, language="fr", max_keywords=20, chunk_words=DEFAULT_CHUNK_WORDS,
+                                 overlap_sentences=DEFAULT_OVERLAP_SENTENCES):
+    """Extraction YAKE par fenêtres de phrases, en mémoire bornée par la taille des fenêtres.
+
+    `source` est une chaîne, un fichier texte ouvert ou un itérable de chaînes. Chaque
+    fenêtre donne ses `5 × max_keywords` meilleurs candidats ; dans une fenêtre où il n'est
+    pas classé, un candidat reçoit le score du dernier classé. Le score global est la
+    moyenne géométrique de ces scores sur toutes les fenêtres (plus bas = meilleur, comme
+    YAKE) : un document tenant dans une seule fenêtre garde ses scores YAKE. Si `source`
+    est une chaîne, les occurrences des mots-clés retenus sont recomptées sur tout le
+    texte ; sinon (lecture en flux) elles ne sont comptées que dans le corps des fenêtres,
+    à partir de la fenêtre où le candidat est apparu, et sont donc approchées par défaut.
+    """
+    per_chunk = max(5 * max_keywords, 50)
+    max_candidates = 20 * max_keywords
+    # candidat -> [somme des log-scores, somme des log-scores « absents » des fenêtres où il est classé, occurrences]
+    candidates = {}
+    n_chunks = 0
+    total_absent = 0.0
+    n_words = 0
+
+    def global_score(stats):
+        return math.exp((stats[0] + total_absent - stats[1]) / n_chunks)
+
+    with checkout_extractor(language, n=3, dedup_lim=0.9, top=per_chunk) as kw_extractor:
+        for context, body in iter_chunks(source, chunk_words, overlap_sentences):
+            window = f"{context} {body}" if context else body
+            ranked = kw_extractor.extract_keywords(window)
+            if ranked:
+                n_chunks += 1
+                absent = math.log(max(ranked[-1][1], 1e-12))
+                total_absent += absent
+                for kw, score in ranked:
+                    stats = candidates.setdefault(kw, [0.0, 0.0, 0])
+                    stats[0] += math.log(max(score, 1e-12))
+                    stats[1] += absent
+
+            tokens = tokenize(body)
+            n_words += len(tokens)
+            counts = count_keyword_occurrences(build_keyword_automaton(candidates), tokens)
+            for kw, count in counts.items():
+                candidates[kw][2] += count
+
+            if len(candidates) > max_candidates:
+                kept = sorted(candidates, key=lambda kw: global_score(candidates[kw]))[:max_candidates]
+                candidates = {kw: candidates[kw] for kw in kept}
+
+    ranked = sorted(candidates.items(), key=lambda item: global_score(item[1]))[:max_keywords]
+    if isinstance(source, str):
+        # Texte entier disponible : comptage exact, mentions antérieures au classement comprises
+        tokens = tokenize(source)
+        counts = count_keyword_occurrences(build_keyword_automaton(kw for kw, _ in ranked), tokens)
+        return [(kw, global_score(stats), counts[kw]) for kw, stats in ranked], len(tokens)
+    return [(kw, global_score(stats), stats[2]) for kw, stats in ranked], n_words
+
+def keywords_to_frame(rows, n_words):
+    """Construit le DataFrame des mots-clés à partir des lignes compactes."""
+    df = pd.DataFrame(rows, columns=['keyword', 'score', 'occurrences'])
+    df['occurrences_per_1000_words'] = df['occurrences'] * 1000 / n_words if n_words else 0.0
     return df
 
-def analyze_text_with_textrazor(text_or_url, api_key, is_url=False):
-    """Analyse un texte ou une URL avec TextRazor."""
+def extract_keywords(text, language="fr", max_keywords=20, backend=None, chunk_words=None):
+    """Extrait les mots-clés d'un texte avec YAKE.
+
+    Avec `backend="process"`, l'extraction est confiée au pool de processus de
+    `utils.yake_workers` au lieu d'occuper le thread appelant (et le GIL). Avec
+    `chunk_words`, le texte est analysé par fenêtres (voir `extract_keyword_rows_chunked`).
+    """
+    with span('yake', text_length=len(text), backend=backend or 'thread', chunk_words=chunk_words):
+        if backend == "process":
+            from .yake_workers import submit_keyword_extraction
+            rows, n_words = submit_keyword_extraction(text, language, max_keywords, chunk_words).result()
+        else:
+            rows, n_words = extract_keyword_rows(text, language, max_keywords, chunk_words)
+        annotate(keywords=len(rows), words=n_words)
+        return keywords_to_frame(rows, n_words)
+
+def extract_keywords_from_source(source, language="fr", max_keywords=20, chunk_words=DEFAULT_CHUNK_WORDS,
+                                 overlap_sentences=DEFAULT_OVERLAP_SENTENCES):
+    """Extrait les mots-clés d'un fichier texte ou d'un itérable de chaînes, sans le charger en entier.
+
+    Sauf pour une chaîne, les occurrences sont approchées (voir `extract_keyword_rows_chunked`) :
+    `df.attrs['occurrences']` vaut alors 'approximate', sinon 'exact'.
+    """
+    with span('yake', backend='chunked', chunk_words=chunk_words):
+        rows, n_words = extract_keyword_rows_chunked(source, language, max_keywords, chunk_words,
+                                                     overlap_sentences)
+        occurrences = 'exact' if isinstance(source, str) else 'approximate'
+        annotate(keywords=len(rows), words=n_words, occurrences=occurrences)
+        df = keywords_to_frame(rows, n_words)
+        df.attrs['occurrences'] = occurrences
+        return df
+
+ENTITY_COLUMNS = ['entity', 'count', 'relevance', 'mean_relevance', 'first_offset']
+
+def aggregate_entities(entities):
+    """Agrège les mentions TextRazor en une ligne par entité, en une seule passe.
+
+    `relevance` est la pertinence maximale des mentions, `mean_relevance` leur moyenne
+    et `first_offset` la position de la première mention dans le texte.
+    """
+    stats = {}
+    for entity in entities:
+        key = entity.id or entity.matched_text
+        if not key:
+            continue
+        relevance = entity.relevance_score or 0.0
+        offset = entity.starting_position
+        current = stats.get(key)
+        if current is None:
+            stats[key] = [1, relevance, relevance, offset]
+            continue
+        current[0] += 1
+        current[1] = max(current[1], relevance)
+        current[2] += relevance
+        if offset is not None and (current[3] is None or offset < current[3]):
+            current[3] = offset
+
+    rows = [
+        (key, count, max_relevance, total_relevance / count, offset)
+        for key, (count, max_relevance, total_relevance, offset) in stats.items()
+    ]
+    return pd.DataFrame(rows, columns=ENTITY_COLUMNS)
+
+def get_textrazor_cache():
+    """Cache disque partagé des analyses TextRazor."""
+    return get_cache('textrazor', ttl=TEXTRAZOR_CACHE_TTL, max_bytes=TEXTRAZOR_CACHE_MAX_BYTES)
+
+def textrazor_cache_key(text_or_url, extractors=TEXTRAZOR_EXTRACTORS, language=None, is_url=False):
+    """Clé de cache d'une analyse : empreinte du texte normalisé (ou de l'URL), des extracteurs et de la langue."""
+    if is_url:
+        content = normalize_url(text_or_url)
+    else:
+        content = ' '.join(text_or_url.split())
+    payload = json.dumps(['url' if is_url else 'text', content, sorted(extractors), language], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def analyze_text_with_textrazor(text_or_url, api_key, is_url=False, language=None, use_cache=True,
+                                expires_at=None):
+    """Analyse un texte ou une URL avec TextRazor.
+
+    Les analyses réussies sont mises en cache : un texte déjà analysé (aux espaces près)
+    avec les mêmes extracteurs et la même langue ne refait pas d'appel à l'API. Les appels
+    passent par le limiteur partagé 'textrazor' (voir `utils.rate_limit`), qui n'attend ni
+    ne réessaie au-delà de `expires_at` (time.monotonic).
+    """
     if not api_key:
         return None, None, None
-    
-    try:
-        client = TextRazor(api_key, extractors=["entities", "topics"])
+
+    with span('textrazor', is_url=is_url, text_length=None if is_url else len(text_or_url)):
+        cache = get_textrazor_cache() if use_cache else None
+        cache_key = textrazor_cache_key(text_or_url, TEXTRAZOR_EXTRACTORS, language, is_url)
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                annotate(cache='hit')
+                entities_df = pd.DataFrame(cached['entities'], columns=ENTITY_COLUMNS)
+                return cached['text'] if is_url else text_or_url, cached['topics'], entities_df
+            annotate(cache='miss')
         
-        if is_url:
-            response = client.analyze_url(text_or_url)
-        else:
-            response = client.analyze(text_or_url)
+        try:
+            client = lazy_import('textrazor').TextRazor(api_key, extractors=TEXTRAZOR_EXTRACTORS)
+            if language in TEXTRAZOR_LANGUAGES:
+                client.set_language_override(TEXTRAZOR_LANGUAGES[language])
             
-        # Extraction des topics
-        topics = [topic.label for topic in response.topics()]
-        
-        # Extraction des entités avec comptage sécurisé
-        entities = []
-        for entity in response.entities():
-            count = sum(1 for _ in filter(lambda x: x.matched_text == entity.matched_text, 
-                                        response.entities()))
-            entities.append({
-                'entity': entity.id,
-                'count': count,
-                'relevance': entity.relevance_score
-            })
-        
-        # Création du DataFrame des entités
-        if entities:
-            entities_df = pd.DataFrame(entities)
-        else:
-            entities_df = pd.DataFrame(columns=['entity', 'count', 'relevance'])
+            limiter = get_limiter('textrazor')
+            if is_url:
+                response = limiter.call(client.analyze_url, text_or_url, expires_at=expires_at)
+            else:
+                response = limiter.call(client.analyze, text_or_url, expires_at=expires_at)
+                
+            # Extraction des topics
+            topics = [topic.label for topic in response.topics()]
             
-        return response.cleaned_text if is_url else text_or_url, topics, entities_df
-        
-    except Exception as e:
-        print(f"Erreur TextRazor: {str(e)}")
-        return None, None, None
+            # Agrégation des entités (une ligne par entité)
+            entities_df = aggregate_entities(response.entities())
+
+            if cache is not None:
+                cache.set(cache_key, {
+                    'text': response.cleaned_text if is_url else None,
+                    'topics': topics,
+                    'entities': entities_df.to_dict('records')
+                })
+            annotate(topics=len(topics), entities=len(entities_df))
+                
+            return response.cleaned_text if is_url else text_or_url, topics, entities_df
+            
+        except Exception as e:
+            annotate(error=type(e).__name__, status=error_status(e))
+            logger.warning("Erreur TextRazor: %s", e)
+            return None, None, None
@@ -0,0 +1,135 @@
+import contextvars
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+_current_trace = contextvars.ContextVar('yake_v4_trace', default=None)
+_current_span = contextvars.ContextVar('yake_v4_span', default=None)
+
+
+class Trace:
+    """Ensemble des spans d'une exécution (une analyse SERP, un lot...)."""
+
+    def __init__(self, name=None):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._spans = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self._spans.append(record)
+
+    def records(self):
+        """Spans terminés, triés par date de début."""
+        with self._lock:
+            return sorted(self._spans, key=lambda r: r['start'])
+
+    def summary(self):
+        return summarize_spans(self.records())
+
+    def to_jsonl(self):
+        return spans_to_jsonl(self.records())
+
+    def export_jsonl(self, path):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(self.to_jsonl())
+
+
+class Span:
+    def __init__(self, attrs):
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+def summarize_spans(records):
+    """Durées agrégées par étape : nombre, total, maximum, erreurs, succès de cache, octets."""
+    stages = {}
+    for record in records:
+        stats = stages.setdefault(record['stage'], {
+            'stage': record['stage'], 'count': 0, 'total_s': 0.0, 'max_s': 0.0,
+            'errors': 0, 'cache_hits': 0, 'bytes': 0
+        })
+        stats['count'] += 1
+        stats['total_s'] += record['duration']
+        stats['max_s'] = max(stats['max_s'], record['duration'])
+        stats['errors'] += 1 if record.get('error') else 0
+        stats['cache_hits'] += 1 if record.get('cache') == 'hit' else 0
+        stats['bytes'] += record.get('bytes') or 0
+    return list(stages.values())
+
+
+def spans_to_jsonl(records):
+    """Une ligne JSON par span, pour l'export."""
+    return ''.join(json.dumps(record, ensure_ascii=False, default=str) + '\n' for record in records)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name=None):
+    """Démarre une trace pour le contexte courant, ou réutilise celle déjà active."""
+    trace = _current_trace.get()
+    if trace is not None:
+        yield trace
+        return
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(stage, **attrs):
+    """Mesure une étape (durée, attributs, classe d'erreur) dans la trace active.
+
+    Sans trace active, le span ne coûte presque rien et n'enregistre rien.
+    """
+    trace = _current_trace.get()
+    current = Span(dict(attrs))
+    if trace is None:
+        yield current
+        return
+
+    token = _current_span.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.attrs.setdefault('error', type(e).__name__)
+        raise
+    finally:
+        end = time.perf_counter()
+        _current_span.reset(token)
+        record = {
+            'trace_id': trace.trace_id,
+            'stage': stage,
+            'start': round(start - trace._origin, 6),
+            'duration': round(end - start, 6),
+            'thread': threading.current_thread().name
+        }
+        record.update(current.attrs)
+        trace.add(record)
+
+
+def annotate(**attrs):
+    """Ajoute des attributs au span en cours (cache, octets, erreur...)."""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attrs)
+
+
+def submit_in_context(executor, fn, *args, **kwargs):
+    """Soumet une tâche à un pool de threads en lui transmettant la trace courante."""
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
@@ -1,11 +1,21 @@
-import plotly.graph_objects as go
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
+import hashlib
 import io
+import json
+import threading
+from collections import OrderedDict
 import pandas as pd
+from .startup import lazy_import
+
+WORDCLOUD_CACHE_SIZE = 64
+
+# Cache LRU des PNG générés
+_wordcloud_cache = OrderedDict()
+_wordcloud_lock = threading.Lock()
 
 def create_keywords_chart(keywords_data, top_n=20):
     """Crée un graphique des mots-clés les plus fréquents."""
+    go = lazy_import('plotly.graph_objects')
+
     if isinstance(keywords_data, list):
         df = pd.DataFrame(keywords_data)
     else:
@@ -54,15 +64,61 @@ def create_keywords_chart(keywords_data, top_n=20):
     
     return fig
 
-def generate_wordcloud(text):
-    """Génère un nuage de mots à partir d'un texte."""
-    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
-    plt.figure(figsize=(10, 5))
-    plt.imshow(wordcloud, interpolation='bilinear')
-    plt.axis('off')
-    
+def keyword_frequencies(keywords_data):
+    """Poids des mots-clés pour le nuage de mots, à partir des mots-clés déjà extraits.
+
+    Utilise les occurrences ; à défaut (aucune occurrence), l'inverse du score YAKE.
+    """
+    df = pd.DataFrame(keywords_data) if isinstance(keywords_data, list) else keywords_data
+    if df is None or df.empty or 'keyword' not in df.columns:
+        return {}
+    column = 'occurrences' if 'occurrences' in df.columns else 'total_occurrences'
+    if column in df.columns:
+        frequencies = {kw: float(occ) for kw, occ in zip(df['keyword'], df[column]) if occ > 0}
+        if frequencies:
+            return frequencies
+    if 'score' in df.columns:
+        return {kw: 1.0 / (score + 1e-9) for kw, score in zip(df['keyword'], df['score'])}
+    return {}
+
+def _wordcloud_cache_key(text, frequencies, width, height, background_color):
+    if frequencies:
+        content = json.dumps(sorted(frequencies.items()), ensure_ascii=False)
+    else:
+        content = text or ''
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    return (digest, bool(frequencies), width, height, background_color)
+
+def clear_wordcloud_cache():
+    with _wordcloud_lock:
+        _wordcloud_cache.clear()
+
+def generate_wordcloud(text=None, frequencies=None, width=800, height=400, background_color='white'):
+    """Génère un nuage de mots (PNG) à partir d'un texte ou de fréquences de mots-clés.
+
+    L'image est écrite directement depuis WordCloud, sans passer par matplotlib, et les
+    PNG sont mis en cache par (empreinte du contenu, taille, options).
+    """
+    key = _wordcloud_cache_key(text, frequencies, width, height, background_color)
+    with _wordcloud_lock:
+        png = _wordcloud_cache.get(key)
+        if png is not None:
+            _wordcloud_cache.move_to_end(key)
+            return io.BytesIO(png)
+
+    WordCloud = lazy_import('wordcloud').WordCloud
+    wordcloud = WordCloud(width=width, height=height, background_color=background_color)
+    if frequencies:
+        wordcloud.generate_from_frequencies(frequencies)
+    else:
+        wordcloud.generate(text)
+
     buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close()
-    buf.seek(0)
-    return buf
\ No newline at end of file
+    wordcloud.to_image().save(buf, format='PNG')
+    png = buf.getvalue()
+
+    with _wordcloud_lock:
+        _wordcloud_cache[key] = png
+        while len(_wordcloud_cache) > WORDCLOUD_CACHE_SIZE:
+            _wordcloud_cache.popitem(last=False)
+    return io.BytesIO(png)
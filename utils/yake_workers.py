@@ -0,0 +1,52 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from .extractor_pool import DEFAULT_LANGUAGES, DEFAULT_TOP, warm_up
+from .text_analysis import extract_keyword_rows
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def default_worker_count():
+    """Nombre de cœurs réellement disponibles pour le processus."""
+    if hasattr(os, 'sched_getaffinity'):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def _init_worker(languages, tops):
+    # Les extracteurs restent chauds pendant toute la vie du processus
+    warm_up(languages, tops)
+
+
+def get_process_pool(max_workers=None, languages=DEFAULT_LANGUAGES, tops=(DEFAULT_TOP,)):
+    """Pool de processus persistant dédié à l'extraction YAKE (créé au premier appel).
+
+    Les processus sont démarrés en mode « spawn » : l'application utilise déjà des
+    threads, qu'il n'est pas sûr de dupliquer avec fork.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers or default_worker_count(),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(tuple(languages), tuple(tops))
+            )
+        return _pool
+
+
+def submit_keyword_extraction(text, language="fr", max_keywords=20, chunk_words=None):
+    """Soumet une extraction au pool ; le résultat est ([(keyword, score, occurrences)], nombre de mots)."""
+    return get_process_pool().submit(extract_keyword_rows, text, language, max_keywords, chunk_words)
+
+
+def shutdown_process_pool(wait=True):
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None